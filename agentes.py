@@ -1,14 +1,53 @@
 from mesa import Agent
 from objetos import Recurso, Estrutura
+from mensagens import AVISTAMENTO_RECURSO, AVISTAMENTO_ESTRUTURA, RECURSO_REMOVIDO
 import math
-import random
+import time
 
 
-class AgenteReativoSimples(Agent):
+class MovimentoPlanejado:
+    """ Passos comuns aos agentes que andam pelo grid: rota reservada e fronteira de exploração da equipe. """
+
+    gerador = None  # Gerador próprio no passo em duas fases (ver PlanetaModelo.semear_agentes)
+
+    @property
+    def random(self):
+        return self.gerador if self.gerador is not None else self.model.random
+
+    def mover_por_reserva(self, destino):
+        """ Dá o próximo passo da rota reservada na tabela espaço-tempo (planejamento cooperativo); False se não houver. """
+        if not self.model.reservas:
+            return False
+        nova_pos = self.model.reservas.proximo_passo(self, destino, self.model.passo_atual)
+        if nova_pos is None:
+            return False
+        self.model.grid.move_agent(self, nova_pos)
+        return True
+
+    def passo_fronteira(self):
+        """ Próxima célula rumo à fronteira de exploração da equipe, ou None sem o motor de exploração. """
+        return self.model.exploracao.proximo_passo(self) if self.model.exploracao else None
+
+    def mover_em_direcao(self, destino):
+        """ Move um passo na direção do destino: pela rota reservada ou para o vizinho mais próximo dele. """
+        if destino is None or self.mover_por_reserva(destino):
+            return
+
+        vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
+        melhor_pos = min(vizinhos, key=lambda p: math.hypot(destino[0] - p[0], destino[1] - p[1]))
+
+        self.model.grid.move_agent(self, melhor_pos)
+
+
+class AgenteReativoSimples(MovimentoPlanejado, Agent):
 
     def __init__(self, unique_id, model, base_pos):
         super().__init__(unique_id, model)
         self.base_pos = base_pos
+        self.reiniciar()
+
+    def reiniciar(self):
+        """ Estado inicial do agente; também usado quando o modelo é reiniciado. """
         self.carregando_recurso = False  # agente está transportando um recurso
         self.current_resource = None  # Guarda o recurso em transporte
 
@@ -24,7 +63,9 @@ class AgenteReativoSimples(Agent):
       vizinhos_livres = [pos for pos in vizinhos if not any(isinstance(obj, Estrutura) for obj in self.model.grid.get_cell_list_contents(pos))]
 
       if vizinhos_livres:
-          nova_pos = self.random.choice(vizinhos_livres)
+          nova_pos = self.passo_fronteira()
+          if nova_pos not in vizinhos_livres:  # Sem fronteira ou caminho bloqueado por estrutura
+              nova_pos = self.random.choice(vizinhos_livres)
           self.model.grid.move_agent(self, nova_pos)
 
           # Verifica se há um recurso leve na nova posição e inicia transporte
@@ -32,8 +73,7 @@ class AgenteReativoSimples(Agent):
               if isinstance(objeto, Recurso) and objeto.tipo in ["Cristal", "Metal"] and not objeto.transportado:
                   self.current_resource = objeto
                   self.carregando_recurso = True
-                  objeto.transportado = True  # Marca o recurso como coletado
-                  self.model.grid.remove_agent(objeto)  # Remove o recurso do grid
+                  self.model.recolher(objeto, self)  # Marca o recurso como coletado e o remove do grid e do registro
                   return  # Fim do passo
       else:
           print(f"Agente {self.unique_id} não encontrou um caminho livre, tentando novamente.")
@@ -45,14 +85,17 @@ class AgenteReativoSimples(Agent):
         else:
             # Entrega o recurso na base e reinicia a exploração
             if self.current_resource:
-                self.model.base.registrar_recurso(self.current_resource)
+                self.model.base.registrar_recurso(self.current_resource, self)
                 self.current_resource = None
 
             self.carregando_recurso = False
             self.explorar_ambiente()
 
     def mover_em_direcao(self, destino):
-        """ Move um passo na direção do destino. """
+        """ Move um passo na direção do destino (pela diagonal até alinhar), ou pela rota reservada. """
+        if self.mover_por_reserva(destino):
+            return
+
         dx, dy = destino[0] - self.pos[0], destino[1] - self.pos[1]
         nova_pos = (self.pos[0] + (1 if dx > 0 else -1 if dx < 0 else 0),
                     self.pos[1] + (1 if dy > 0 else -1 if dy < 0 else 0))
@@ -65,19 +108,23 @@ class AgenteReativoSimples(Agent):
 
 
 import math
-import random
 from mesa import Agent
 
-class AgenteBaseadoEmEstado(Agent):
+class AgenteBaseadoEmEstado(MovimentoPlanejado, Agent):
     def __init__(self, unique_id, model, base_pos):
         super().__init__(unique_id, model)
         self.base_pos = base_pos
+        self.historico_movimento = set()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """ Estado inicial do agente; também usado quando o modelo é reiniciado. """
         self.carregando_recurso = False
         self.recurso_atual = None
-        self.historico_movimento = set()
-        self.registros_locais = []  # Guarda informações de recursos e estruturas encontradas
+        self.historico_movimento.clear()
         self.estado = "explorando"
         self.destino_atual = None
+        self.destino_recurso = None
         self.objetivo_atual = "explorar"
 
     def step(self):
@@ -103,7 +150,7 @@ class AgenteBaseadoEmEstado(Agent):
             self.mover_em_direcao(self.base_pos)
         else:
             if self.recurso_atual:
-                self.model.base.registrar_recurso(self.recurso_atual)
+                self.model.base.registrar_recurso(self.recurso_atual, self)
                 self.recurso_atual = None
 
             self.carregando_recurso = False
@@ -115,28 +162,30 @@ class AgenteBaseadoEmEstado(Agent):
     def explorar_ambiente(self):
         """ registra informações sobre estruturas. """
         vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        vizinhos_nao_visitados = [pos for pos in vizinhos if pos not in self.historico_movimento]
+        melhor_pos = self.passo_fronteira()
 
-        if vizinhos_nao_visitados:
-            melhor_pos = random.choice(vizinhos_nao_visitados)
-        else:
-            melhor_pos = random.choice(vizinhos)
+        if melhor_pos is None:
+            vizinhos_nao_visitados = [pos for pos in vizinhos if pos not in self.historico_movimento]
+            if vizinhos_nao_visitados:
+                melhor_pos = self.random.choice(vizinhos_nao_visitados)
+            else:
+                melhor_pos = self.random.choice(vizinhos)
 
         self.model.grid.move_agent(self, melhor_pos)
         self.historico_movimento.add(melhor_pos)
 
         objetos = self.model.grid.get_cell_list_contents(melhor_pos)
         for objeto in objetos:
-            if isinstance(objeto, Estrutura):
-                self.registros_locais.append({"tipo": "Estrutura", "pos": objeto.pos})  # registra estrutura
-                if not self.carregando_recurso:
+            if isinstance(objeto, Estrutura) and not objeto.transportado:
+                self.model.mensagens.publicar(self, AVISTAMENTO_ESTRUTURA, objeto.pos)  # registra estrutura
+                if self.model.encontros is not None:  # Transporte com vários carregadores: pede ajuda e espera
+                    if not self.carregando_recurso and self.model.encontros.pedir(objeto, self):
+                        return
+                elif not self.carregando_recurso:
                     self.recurso_atual = objeto
                     self.carregando_recurso = True
-                    objeto.transportado = True
-                    self.model.grid.remove_agent(objeto)
+                    self.model.recolher(objeto, self)
                     return
-                else:
-                    self.registros_locais.append({"tipo": objeto.tipo, "pos": objeto.pos})
 
     def definir_destino(self, destino):
         """ Define um novo destino baseado em informações do BDI ou lógica interna. """
@@ -146,16 +195,6 @@ class AgenteBaseadoEmEstado(Agent):
         else:
             self.objetivo_atual = "explorar"
 
-    def mover_em_direcao(self, destino):
-        """ Move um passo na direção do destino de maneira eficiente. """
-        if not destino:
-            return
-
-        vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        melhor_pos = min(vizinhos, key=lambda p: math.hypot(destino[0] - p[0], destino[1] - p[1]))
-
-        self.model.grid.move_agent(self, melhor_pos)
-
     
 
  
@@ -163,15 +202,18 @@ class AgenteBaseadoEmEstado(Agent):
 #----------------------------------------------------------------------------
 
 
-class AgenteBaseadoEmObjetivos(Agent):
+class AgenteBaseadoEmObjetivos(MovimentoPlanejado, Agent):
 
     def __init__(self, unique_id, model, base_pos):
         super().__init__(unique_id, model)
         self.base_pos = base_pos
+        self.reiniciar()
+
+    def reiniciar(self):
+        """ Estado inicial do agente; também usado quando o modelo é reiniciado. """
         self.carregando_recurso = False
         self.recurso_atual = None
         self.destino_recurso = None
-        self.registros_locais = []  # Guarda apenas informações de recursos e estruturas
         self.objetivo_atual = "explorar"
 
     def step(self):
@@ -205,16 +247,20 @@ class AgenteBaseadoEmObjetivos(Agent):
             self.objetivo_atual = "coletar"
             self.tentar_coletar_recurso()
         else:
-            # Movimenta estrategicamente sem interagir com estruturas
-            nova_pos = random.choice(vizinhos)
+            # Movimenta estrategicamente sem interagir com estruturas, seguindo a fronteira da equipe
+            nova_pos = self.passo_fronteira()
+            if nova_pos is None:
+                nova_pos = self.random.choice(vizinhos)
             self.model.grid.move_agent(self, nova_pos)
 
             objetos = self.model.grid.get_cell_list_contents(nova_pos)
             for objeto in objetos:
                 if isinstance(objeto, Estrutura):
-                    self.registros_locais.append({"tipo": "Estrutura", "pos": objeto.pos})  #  registra a estrutura
+                    self.model.mensagens.publicar(self, AVISTAMENTO_ESTRUTURA, objeto.pos)  #  registra a estrutura
+                    if self.model.encontros is not None and self.model.encontros.pedir(objeto, self):
+                        return
                 elif isinstance(objeto, Recurso) and not objeto.transportado:
-                    self.registros_locais.append({"tipo": objeto.tipo, "pos": objeto.pos})
+                    self.model.mensagens.publicar(self, AVISTAMENTO_RECURSO, objeto.pos, (objeto.tipo, objeto.utilidade))
 
     def definir_destino(self, destino):
         """ Define o destino do agente para buscar um recurso. """
@@ -231,11 +277,11 @@ class AgenteBaseadoEmObjetivos(Agent):
             if isinstance(obj, Recurso) and not obj.transportado:
                 self.recurso_atual = obj
                 self.carregando_recurso = True
-                obj.transportado = True
-                self.model.grid.remove_agent(obj)
+                self.model.recolher(obj, self)
                 self.objetivo_atual = "transportar"
                 return
 
+        self.model.mensagens.publicar(self, RECURSO_REMOVIDO, self.pos)  # Nada para coletar aqui
         self.definir_destino(self.recurso_mais_proximo())
 
     def mover_para_base(self):
@@ -244,7 +290,7 @@ class AgenteBaseadoEmObjetivos(Agent):
             self.mover_em_direcao(self.base_pos)
         else:
             if self.recurso_atual:
-                self.model.base.registrar_recurso(self.recurso_atual)
+                self.model.base.registrar_recurso(self.recurso_atual, self)
                 self.recurso_atual = None
 
             self.carregando_recurso = False
@@ -254,19 +300,9 @@ class AgenteBaseadoEmObjetivos(Agent):
             self.destino_recurso = destino_bdi if destino_bdi else None
             self.objetivo_atual = "explorar"
 
-    def mover_em_direcao(self, destino):
-        """ Move um passo na direção do destino sem depender da distância para base. """
-        if not destino:
-            return
-
-        vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        melhor_pos = min(vizinhos, key=lambda p: math.hypot(destino[0] - p[0], destino[1] - p[1]))
-
-        self.model.grid.move_agent(self, melhor_pos)
-
     def recurso_mais_proximo(self):
         """ Retorna o recurso mais próximo para coleta. """
-        recursos = [ag for ag in self.model.schedule.agents if isinstance(ag, Recurso) and not ag.transportado]
+        recursos = self.model.registro.do_tipo(Recurso)  # Apenas recursos ainda no grid
         if not recursos:
             return None
         mais_proximo = min(recursos, key=lambda r: math.hypot(r.pos[0] - self.pos[0], r.pos[1] - self.pos[1]))
@@ -276,17 +312,27 @@ class AgenteBaseadoEmObjetivos(Agent):
 
 #----------------------------------------------------------------------------
 
-class AgenteCooperativo(Agent):
+class AgenteCooperativo(MovimentoPlanejado, Agent):
     def __init__(self, unique_id, model, base_pos):
         super().__init__(unique_id, model)
         self.base_pos = base_pos
+        self.reiniciar()
+
+    def reiniciar(self):
+        """ Estado inicial do agente; também usado quando o modelo é reiniciado. """
         self.carregando_recurso = False
         self.recurso_atual = None
         self.destino_recurso = None
-        self.registros_locais = []  # Registra informações sobre recursos e estruturas
         self.objetivo_atual = "explorar"
+        self.destino_encontro = None  # Estrutura que aceitou ajudar a transportar (ver encontro.py)
 
     def step(self):
+        if self.destino_encontro is not None:
+            if self.pos != self.destino_encontro:
+                self.mover_em_direcao(self.destino_encontro)
+            if self.pos == self.destino_encontro:
+                self.model.encontros.chegar(self)
+            return
         if self.carregando_recurso:
             self.mover_para_base()
         elif self.objetivo_atual == "buscar_recurso":
@@ -312,18 +358,30 @@ class AgenteCooperativo(Agent):
             self.objetivo_atual = "buscar_recurso"
         else:
             self.consultar_bdi()
+            if self.objetivo_atual == "explorar" and self.model.percepcao:
+                self.buscar_com_sensores()
             self.explorar_ambiente()
 
         #Garante que estruturas e recursos sejam registrados corretamente no BDI
         for obj in objetos:
             if isinstance(obj, Estrutura):
-                self.registros_locais.append({"tipo": "Estrutura", "pos": obj.pos})  # registra estruturas
+                self.model.mensagens.publicar(self, AVISTAMENTO_ESTRUTURA, obj.pos)  # registra estruturas
             elif isinstance(obj, Recurso) and not obj.transportado:
-                self.registros_locais.append({"tipo": obj.tipo, "pos": obj.pos, "utilidade": obj.utilidade}) 
+                self.model.mensagens.publicar(self, AVISTAMENTO_RECURSO, obj.pos, (obj.tipo, obj.utilidade))
+
+    def buscar_com_sensores(self):
+        """ Sem missão do BDI: segue para o recurso mais próximo ao alcance dos sensores, se houver algum. """
+        leitura = self.model.perceber(self)
+        if not (leitura["Cristal"] or leitura["Metal"]):
+            return
+        celulas = self.model.percepcao.celulas(self.pos, self.model.raio_percepcao)
+        if celulas:
+            self.destino_recurso = min(celulas, key=lambda p: (max(abs(p[0] - self.pos[0]), abs(p[1] - self.pos[1])), p))
+            self.objetivo_atual = "buscar_recurso"
 
     def consultar_bdi(self):
         """ Consulta o BDI e escolhe um novo recurso, garantindo que não seja um local onde o agente já coletou. """
-        dados_bdi = [r for r in self.model.agente_bdi.beliefs["recursos_confirmados"] if "utilidade" in r and r["pos"] != self.pos]
+        dados_bdi = [r for r in self.model.agente_bdi.beliefs["recursos_confirmados"].values() if "utilidade" in r and r["pos"] != self.pos]
 
         if dados_bdi:
             melhor_recurso_marcado = max(dados_bdi, key=lambda r: r["utilidade"] / (math.hypot(r["pos"][0] - self.base_pos[0], r["pos"][1] - self.base_pos[1]) + 1))
@@ -342,7 +400,7 @@ class AgenteCooperativo(Agent):
             self.mover_em_direcao(self.base_pos)
         else:
             if self.recurso_atual:
-                self.model.base.registrar_recurso(self.recurso_atual)
+                self.model.base.registrar_recurso(self.recurso_atual, self)
                 self.recurso_atual = None
 
             self.carregando_recurso = False
@@ -358,12 +416,10 @@ class AgenteCooperativo(Agent):
 
     def explorar_ambiente(self):
         vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        vizinhos_nao_visitados = [pos for pos in vizinhos if pos not in self.registros_locais]
+        nova_pos = self.passo_fronteira()
 
-        if vizinhos_nao_visitados:
-            nova_pos = random.choice(vizinhos_nao_visitados)
-        else:
-            nova_pos = random.choice(vizinhos)
+        if nova_pos is None:
+            nova_pos = self.random.choice(vizinhos)
 
         self.model.grid.move_agent(self, nova_pos)
 
@@ -374,21 +430,10 @@ class AgenteCooperativo(Agent):
             if isinstance(obj, Recurso) and not obj.transportado:
                 self.recurso_atual = obj
                 self.carregando_recurso = True
-                obj.transportado = True
-                self.model.grid.remove_agent(obj)
+                self.model.recolher(obj, self)
                 self.objetivo_atual = "transportar"
                 return
 
-    def mover_em_direcao(self, destino):
-        """ Move um passo na direção do destino de maneira eficiente. """
-        if destino is None:
-            return
-
-        vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        melhor_pos = min(vizinhos, key=lambda p: math.hypot(destino[0] - p[0], destino[1] - p[1]))
-
-        self.model.grid.move_agent(self, melhor_pos)
-
     def distancia_para_base(self, pos):
         """ Calcula a distância euclidiana até a base. """
         return math.sqrt((self.base_pos[0] - pos[0])**2 + (self.base_pos[1] - pos[1])**2)
@@ -398,39 +443,131 @@ class AgenteCooperativo(Agent):
 
 class AgenteBDI(Agent):
 
-    def __init__(self, unique_id, model):
+    def __init__(self, unique_id, model, ttl_crencas=None, max_crencas=None):
         super().__init__(unique_id, model)
+        # Recursos e estruturas ficam em dicionários posição -> crença, na ordem em que foram (re)confirmados
         self.beliefs = {"explorados": set(),
-                        "recursos_confirmados": [],
-                        "estruturas_marcadas": []}
+                        "recursos_confirmados": {},
+                        "estruturas_marcadas": {}}
         self.intentions = {}
+        self.ttl_crencas = ttl_crencas  # Passos sem reconfirmação até a crença ser esquecida (None = nunca)
+        self.max_crencas = max_crencas  # Máximo de crenças por categoria; as mais antigas saem primeiro
+        self.invalidadas = set()  # Posições cujo objeto saiu do grid; avistamentos atrasados delas são ignorados
+        self.reiniciar()
+
+    def reiniciar(self):
+        """ Esquece todas as crenças e intenções, mantendo as estruturas já alocadas. """
+        for crencas in self.beliefs.values():
+            crencas.clear()
+        self.intentions.clear()
+        self.invalidadas.clear()
+        self.crencas_expiradas = 0
+        self.crencas_invalidadas = 0
+        # Planejamento incremental: só agentes "sujos" (ociosos, sem missão ou com o alvo perdido) são replanejados
+        self.sujos = {}  # unique_id -> agente a replanejar, em ordem de chegada
+        self.aguardando = {}  # unique_id -> agente explorando por falta de recursos conhecidos
+        self.designados = {}  # posição do recurso -> agente enviado para ele
+        self.planejamentos = 0
+        self.adiados = 0  # Agentes que ficaram sem planejamento no último passo (retomados no seguinte)
 
     def receber_informacoes(self, agente):
-        """ Processa informações enviadas pelos agentes ao chegarem na base. """
-        if self.pos == self.model.base_pos and hasattr(agente, 'registros_locais'):
-            for reg in agente.registros_locais:
-                if reg['tipo'] == 'Estrutura' and reg not in self.beliefs['estruturas_marcadas']:
-                    self.beliefs['estruturas_marcadas'].append(reg)  # registra a estrutura
-                elif reg['tipo'] != 'Estrutura' and reg not in self.beliefs['recursos_confirmados']:
-                    self.beliefs['recursos_confirmados'].append(reg) 
+        """ Descarrega as mensagens do agente que chegou à base; elas são entregues em lote no fim do passo. """
+        if self.pos == self.model.base_pos:
+            self.model.mensagens.descarregar(agente)
+
+    def receber_mensagens(self, lote):
+        """ Atualiza as crenças com o lote de mensagens do passo; um novo avistamento renova a crença. """
+        passo = self.model.passo_atual
+        for mensagem in lote:
+            if mensagem.tipo == AVISTAMENTO_RECURSO:
+                if mensagem.pos not in self.invalidadas:
+                    tipo, utilidade = mensagem.dado
+                    novo = mensagem.pos not in self.beliefs["recursos_confirmados"] and mensagem.pos not in self.designados
+                    self._confirmar("recursos_confirmados", mensagem.pos,
+                                    {"tipo": tipo, "pos": mensagem.pos, "utilidade": utilidade, "passo": passo})
+                    if novo and self.aguardando:  # Um recurso novo acorda um agente à espera de missão
+                        self.marcar_sujo(self.aguardando.pop(next(iter(self.aguardando))))
+            elif mensagem.tipo == AVISTAMENTO_ESTRUTURA:
+                if mensagem.pos not in self.invalidadas:
+                    self._confirmar("estruturas_marcadas", mensagem.pos,
+                                    {"tipo": "Estrutura", "pos": mensagem.pos, "passo": passo})  # registra a estrutura
+            elif mensagem.tipo == RECURSO_REMOVIDO:
+                self.invalidar(mensagem.pos)
+
+    def invalidar(self, pos):
+        """ Notificação de mudança no mundo: o objeto em `pos` foi coletado ou transportado. """
+        self.invalidadas.add(pos)
+        removida = self.beliefs["recursos_confirmados"].pop(pos, None)
+        removida = self.beliefs["estruturas_marcadas"].pop(pos, None) or removida
+        if removida:
+            self.crencas_invalidadas += 1
+        agente = self.designados.pop(pos, None)
+        if agente is not None:  # O alvo do agente sumiu (coletado por ele ou por outro): replaneja
+            self.intentions.pop(agente.unique_id, None)
+            self.marcar_sujo(agente)
+
+    def marcar_sujo(self, agente):
+        """ Pede o replanejamento de um agente estratégico no próximo passo do BDI. """
+        if isinstance(agente, (AgenteBaseadoEmEstado, AgenteBaseadoEmObjetivos)):
+            self.sujos.setdefault(agente.unique_id, agente)
+
+    def expirar_crencas(self):
+        """ Esquece crenças não reconfirmadas há mais de `ttl_crencas` passos e corta o excesso acima de `max_crencas`. """
+        limite = self.model.passo_atual - self.ttl_crencas if self.ttl_crencas is not None else None
+        for categoria in ("recursos_confirmados", "estruturas_marcadas"):
+            crencas = self.beliefs[categoria]
+            # A ordem de inserção é a ordem de confirmação, então as mais antigas estão sempre no início
+            while crencas:
+                pos, crenca = next(iter(crencas.items()))
+                if not ((limite is not None and crenca["passo"] < limite)
+                        or (self.max_crencas is not None and len(crencas) > self.max_crencas)):
+                    break
+                del crencas[pos]
+                self.crencas_expiradas += 1
+
+    def _confirmar(self, categoria, pos, crenca):
+        crencas = self.beliefs[categoria]
+        crencas.pop(pos, None)  # Reinsere no fim para manter a ordem por passo de confirmação
+        crencas[pos] = crenca
 
     def direcionar_agentes(self):
-        """ Define missões apenas para coleta de recursos, ignorando estruturas. """
-        for ag in self.model.agentes_baseados_estado + self.model.agentes_baseados_objetivos:
-            destino = None
-            
-            if self.beliefs["recursos_confirmados"]:  # prioriza recursos
-                destino = self.beliefs["recursos_confirmados"].pop(0)["pos"]
-
-            if destino:
+        """
+        Define missões apenas para coleta de recursos, ignorando estruturas, para os agentes marcados como sujos
+        (o custo por passo acompanha as mudanças, não a população). No modo de tempo real (`model.prazo_passo`)
+        planeja até o prazo do passo, ao menos um agente, e os demais continuam sujos para o passo seguinte.
+        """
+        prazo = self.model.prazo_passo
+        recursos = self.beliefs["recursos_confirmados"]
+        planejados = 0
+        while self.sujos:
+            if prazo is not None and planejados and time.perf_counter() >= prazo:
+                break
+            ag = self.sujos.pop(next(iter(self.sujos)))
+            planejados += 1
+            if ag.carregando_recurso:  # Volta a ficar sujo quando entregar
+                continue
+
+            anterior = self.intentions.pop(ag.unique_id, None)
+            if anterior is not None and self.designados.get(anterior) is ag:
+                del self.designados[anterior]
+
+            if recursos:  # prioriza recursos, do mais antigo para o mais recente
+                destino = recursos.pop(next(iter(recursos)))["pos"]
+                self.aguardando.pop(ag.unique_id, None)
                 self.intentions[ag.unique_id] = destino
+                self.designados[destino] = ag
                 ag.definir_destino(destino)
+                if self.model.gravador:
+                    self.model.gravador.atribuicao(self.model.passo_atual, ag, destino)
             else:
                 ag.objetivo_atual = "explorar"
+                self.aguardando[ag.unique_id] = ag
+
+        self.planejamentos += planejados
+        self.adiados = len(self.sujos)
 
     def step(self):
-        if not self.beliefs["recursos_confirmados"]:  # ignora completamente `estruturas_marcadas`
-            for ag in self.model.agentes_baseados_estado + self.model.agentes_baseados_objetivos:
-                ag.objetivo_atual = "explorar"
+        if self.ttl_crencas is not None or self.max_crencas is not None:
+            self.expirar_crencas()
 
         self.direcionar_agentes()
@@ -0,0 +1,398 @@
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agentes import AgenteBaseadoEmEstado, AgenteBaseadoEmObjetivos, AgenteCooperativo, AgenteReativoSimples
+from mensagens import AVISTAMENTO_RECURSO, RECURSO_REMOVIDO, Mensagem
+from objetos import Recurso
+from planet_model import PlanetaModelo
+
+TAMANHOS = (500, 750, 1000, 1500, 2000, 3000, 4000, 6000, 8000)
+# Rodadas de medição por tamanho: vale a menor mediana (a rodada menos perturbada pelo resto da máquina)
+RODADAS = 5
+# Folga sobre o expoente declarado antes de acusar regressão (ruído de medição e efeitos de cache)
+TOLERANCIA = 0.3
+
+# nome -> (função que monta o caso para o tamanho n, expoente declarado: 0 = O(1), 1 = O(n))
+CASOS = {}
+
+
+def caso(nome, expoente):
+    def registrar(funcao):
+        CASOS[nome] = (funcao, expoente)
+        return funcao
+    return registrar
+
+
+def construir_modelo(n, **parametros):
+    """ Mundo com `n` recursos em um grid que cresce junto, mantendo a densidade constante. """
+    lado = math.ceil(math.sqrt(4 * n))
+    return PlanetaModelo(lado, lado, n, max(n // 100, 1), 2, 4, 4, 2, seed=0, **parametros)
+
+
+# Ids dos recursos criados pelos casos, distintos dos R_i do modelo
+_ids_recursos = itertools.count(1)
+
+
+def _novo_recurso(modelo, pos):
+    recurso = Recurso(f"RB_{next(_ids_recursos)}", modelo, "Metal", 20, None)
+    recurso.reiniciar("Metal", 20, pos)  # Como em PlanetaModelo._montar: fora do grid até place_agent
+    if pos is not None:
+        modelo.grid.place_agent(recurso, pos)
+        modelo.registro.adicionar(recurso)
+    return recurso
+
+
+def _reposicionar(modelo, agente, pos):
+    """ Devolve o agente à posição inicial e ao estado de exploração (fora da medição). """
+    if agente.pos != pos:
+        modelo.grid.move_agent(agente, pos)
+    agente.carregando_recurso = False
+    for atributo in ("recurso_atual", "current_resource", "destino_recurso"):
+        if hasattr(agente, atributo):
+            setattr(agente, atributo, None)
+    if hasattr(agente, "objetivo_atual"):
+        agente.objetivo_atual = "explorar"
+
+
+# --- BDI ---------------------------------------------------------------------------------------------------
+
+def _crencas(modelo, n):
+    """ Preenche o BDI com `n` recursos confirmados em posições fictícias. """
+    bdi = modelo.agente_bdi
+    for i in range(n):
+        pos = (-1, i)
+        bdi.beliefs["recursos_confirmados"][pos] = {"tipo": "Metal", "pos": pos, "utilidade": 20, "passo": 0}
+    return bdi
+
+
+@caso("AgenteBDI.receber_mensagens", 0)
+def caso_receber_mensagens(n):
+    """ Lote fixo (20 avistamentos novos + 20 remoções) sobre uma base de `n` crenças. """
+    modelo = construir_modelo(n)
+    bdi = _crencas(modelo, n)
+    proximo = [n]
+    lote = []
+
+    def preparar():
+        lote.clear()
+        for _ in range(20):
+            lote.append(Mensagem(AVISTAMENTO_RECURSO, (-1, proximo[0]), "AE_0", ("Metal", 20)))
+            proximo[0] += 1
+        for pos in list(bdi.beliefs["recursos_confirmados"])[:20]:
+            lote.append(Mensagem(RECURSO_REMOVIDO, pos, "AE_0", None))
+
+    return preparar, lambda: bdi.receber_mensagens(lote)
+
+
+@caso("AgenteBDI.receber_informacoes", 1)
+def caso_receber_informacoes(n):
+    """ Descarregar e entregar `n` mensagens enfileiradas por um agente na base. """
+    modelo = construir_modelo(n, mensagens={"capacidade_fila": n})
+    bdi = modelo.agente_bdi
+    agente = modelo.agentes_baseados_estado[0]
+
+    def preparar():
+        for i in range(n):
+            modelo.mensagens.publicar(agente, AVISTAMENTO_RECURSO, (-2, i), ("Metal", 20))
+
+    def operar():
+        bdi.receber_informacoes(agente)
+        modelo.mensagens.entregar(bdi)
+
+    return preparar, operar
+
+
+@caso("AgenteBDI.direcionar_agentes", 0)
+def caso_direcionar_agentes(n):
+    """ Replanejamento de um número fixo de agentes sujos com `n` recursos confirmados. """
+    modelo = construir_modelo(n)
+    bdi = _crencas(modelo, n)
+    proximo = [n]
+
+    def preparar():
+        crencas = bdi.beliefs["recursos_confirmados"]
+        while len(crencas) < n:
+            pos = (-1, proximo[0])
+            crencas[pos] = {"tipo": "Metal", "pos": pos, "utilidade": 20, "passo": 0}
+            proximo[0] += 1
+        for agente in modelo.agentes_baseados_estado + modelo.agentes_baseados_objetivos:
+            bdi.marcar_sujo(agente)
+
+    return preparar, bdi.direcionar_agentes
+
+
+# --- Agentes -----------------------------------------------------------------------------------------------
+
+def _caso_agente(classe, metodo, n):
+    modelo = construir_modelo(n)
+    agente = next(iter(modelo.registro.do_tipo(classe)))
+    origem = agente.pos
+    destino = (modelo.width - 1, modelo.height - 1)
+
+    if metodo == "mover_em_direcao":
+        return lambda: _reposicionar(modelo, agente, origem), lambda: agente.mover_em_direcao(destino)
+    if metodo == "tentar_coletar_recurso":
+        def preparar():
+            _reposicionar(modelo, agente, origem)
+            _novo_recurso(modelo, origem)
+        return preparar, agente.tentar_coletar_recurso
+    return lambda: _reposicionar(modelo, agente, origem), getattr(agente, metodo)
+
+
+for _classe, _metodos in ((AgenteReativoSimples, ("explorar_ambiente", "mover_em_direcao")),
+                          (AgenteBaseadoEmEstado, ("explorar_ambiente", "mover_em_direcao")),
+                          (AgenteBaseadoEmObjetivos, ("explorar_ambiente", "mover_em_direcao", "tentar_coletar_recurso")),
+                          (AgenteCooperativo, ("explorar_ambiente", "mover_em_direcao", "tentar_coletar_recurso"))):
+    for _metodo in _metodos:
+        CASOS[f"{_classe.__name__}.{_metodo}"] = (
+            lambda n, classe=_classe, metodo=_metodo: _caso_agente(classe, metodo, n), 0)
+
+
+@caso("AgenteBaseadoEmObjetivos.recurso_mais_proximo", 1)
+def caso_recurso_mais_proximo(n):
+    """ Varredura declarada: percorre os `n` recursos ainda no grid. """
+    modelo = construir_modelo(n)
+    agente = modelo.agentes_baseados_objetivos[0]
+    return lambda: None, agente.recurso_mais_proximo
+
+
+# --- Base --------------------------------------------------------------------------------------------------
+
+@caso("BaseInicial.registrar_recurso", 0)
+def caso_registrar_recurso(n):
+    """ Uma entrega com `n` entregas já registradas no livro. """
+    modelo = construir_modelo(n)
+    agente = modelo.agentes_reativos[0]
+    for i in range(n):
+        modelo.base.livro.registrar(0, "Metal", 20, (i, i), agente.unique_id)
+    recurso = []
+
+    def preparar():
+        recurso[:] = [_novo_recurso(modelo, None)]
+
+    return preparar, lambda: modelo.base.registrar_recurso(recurso[0], agente)
+
+
+# --- Percepção ---------------------------------------------------------------------------------------------
+
+def _modelo_percepcao(n):
+    modelo = construir_modelo(n, percepcao={"raio": 5})
+    modelo.percepcao.atualizar()
+    centro = (modelo.width // 2, modelo.height // 2)
+    return modelo, centro
+
+
+@caso("Percepcao.contar", 0)
+def caso_percepcao_contar(n):
+    """ Recursos por tipo num raio fixo, pelas tabelas de áreas somadas. """
+    modelo, centro = _modelo_percepcao(n)
+    return lambda: None, lambda: modelo.percepcao.contar(centro, 5, "Metal")
+
+
+@caso("Percepcao.celulas", 0)
+def caso_percepcao_celulas(n):
+    """ Células com recursos num raio fixo (densidade constante: resultado de tamanho fixo). """
+    modelo, centro = _modelo_percepcao(n)
+    return lambda: None, lambda: modelo.percepcao.celulas(centro, 5)
+
+
+@caso("Percepcao.perceber_todos", 0)
+def caso_percepcao_lote(n):
+    """ Leitura em lote dos sensores de um número fixo de agentes. """
+    modelo, _ = _modelo_percepcao(n)
+    passo = [0]
+
+    def preparar():
+        passo[0] += 1  # Passo novo: o lote é recalculado
+
+    return preparar, lambda: modelo.percepcao.perceber_todos(modelo.agentes_ativos, passo[0], 5)
+
+
+@caso("Percepcao.atualizar", 0.5)
+def caso_percepcao_atualizar(n):
+    """ Atualizar as tabelas depois de uma coleta: um bloco e as faixas da sua coluna e linha (~ lado do grid). """
+    modelo, centro = _modelo_percepcao(n)
+    recurso = _novo_recurso(modelo, None)
+    recurso.pos = centro
+
+    def preparar():
+        modelo.percepcao.adicionar(recurso)
+
+    return preparar, modelo.percepcao.atualizar
+
+
+# --- Medição -----------------------------------------------------------------------------------------------
+
+def medir(preparar, operar, repeticoes, rodadas=RODADAS):
+    """
+    Tempo (ns) de `operar`: a menor entre as medianas de `rodadas` rodadas de `repeticoes` chamadas,
+    com `preparar` executado fora da medição antes de cada chamada.
+    """
+    medianas = []
+    for _ in range(rodadas):
+        tempos = []
+        for _ in range(repeticoes):
+            preparar()
+            inicio = time.perf_counter_ns()
+            operar()
+            tempos.append(time.perf_counter_ns() - inicio)
+        medianas.append(statistics.median(tempos))
+    return min(medianas)
+
+
+def ajustar_expoente(tamanhos, tempos):
+    """ Inclinação da reta de mínimos quadrados em log-log: tempo ~ n^expoente. """
+    xs = [math.log(n) for n in tamanhos]
+    ys = [math.log(max(t, 1)) for t in tempos]
+    mx, my = statistics.fmean(xs), statistics.fmean(ys)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
+
+
+def executar_casos(nomes=None, tamanhos=TAMANHOS, repeticoes=200, tolerancia=TOLERANCIA, rodadas=RODADAS):
+    resultados = []
+    for nome, (montar, expoente_declarado) in CASOS.items():
+        if nomes and not any(filtro in nome for filtro in nomes):
+            continue
+        tempos = []
+        for n in tamanhos:
+            preparar, operar = montar(n)
+            # Operações lineares ficam caras nos tamanhos grandes: limita o trabalho total por tamanho
+            tempos.append(medir(preparar, operar, max(repeticoes * tamanhos[0] // n, 5) if expoente_declarado else repeticoes,
+                                rodadas))
+        expoente = ajustar_expoente(tamanhos, tempos)
+        resultados.append({
+            "caso": nome,
+            "tempos_ns": dict(zip(tamanhos, tempos)),
+            "expoente": expoente,
+            "expoente_declarado": expoente_declarado,
+            "aprovado": expoente <= expoente_declarado + tolerancia,
+        })
+    return resultados
+
+
+# Mapas pequenos (lado, recursos, estruturas) para comparar a vazão de réplicas com e sem reinício
+MAPAS_REINICIO = ((10, 10, 1), (20, 40, 2), (40, 150, 5))
+
+
+def vazao_replicas(mapas=MAPAS_REINICIO, replicas=50, passos=50):
+    """ Réplicas por segundo construindo um PlanetaModelo novo a cada réplica vs. reiniciando o mesmo modelo. """
+    resultados = []
+    for lado, num_recursos, num_estruturas in mapas:
+        parametros = (lado, lado, num_recursos, num_estruturas, 2, 2, 2, 2)
+        inicio = time.perf_counter()
+        for semente in range(replicas):
+            PlanetaModelo(*parametros, seed=semente).executar(passos)
+        novo = time.perf_counter() - inicio
+
+        modelo = PlanetaModelo(*parametros, seed=0)
+        inicio = time.perf_counter()
+        for semente in range(replicas):
+            modelo.reiniciar(semente)
+            modelo.executar(passos)
+        reiniciado = time.perf_counter() - inicio
+
+        resultados.append({
+            "lado": lado,
+            "recursos": num_recursos,
+            "passos": passos,
+            "replicas_por_s_novo": replicas / novo,
+            "replicas_por_s_reinicio": replicas / reiniciado,
+            "ganho": novo / reiniciado,
+        })
+    return resultados
+
+
+# Mapas (lado, recursos, estruturas, agentes de cada tipo) para a verificação do passo em duas fases
+CENARIOS_DUAS_FASES = ((20, 30, 5, 2), (40, 150, 5, 4))
+
+
+def verificar_duas_fases(cenarios=CENARIOS_DUAS_FASES, sementes=range(5), passos=300, threads=4):
+    """
+    Regressão do passo em duas fases: com decisões em sequência cada execução precisa terminar (as disputas são
+    desfeitas) e se repetir igual com a mesma semente, num modelo novo e num reiniciado; com decisões em threads
+    o resultado precisa ser o mesmo das decisões em sequência.
+    """
+    def rodar(modelo):
+        resultado = modelo.executar(passos)
+        return resultado["utilidade_total"], resultado["recursos_entregues"], resultado["passos"]
+
+    resultados = []
+    with ThreadPoolExecutor(threads) as executor:
+        for lado, num_recursos, num_estruturas, agentes in cenarios:
+            parametros = (lado, lado, num_recursos, num_estruturas) + (agentes,) * 4
+            for semente in sementes:
+                modelo = PlanetaModelo(*parametros, seed=semente, sincrono=True, reservas=True)
+                obtido = rodar(modelo)
+                modelo.reiniciar(semente)
+                repetido = rodar(modelo)
+                paralelo = rodar(PlanetaModelo(*parametros, seed=semente, sincrono={"executor": executor}, reservas=True))
+                resultados.append({"lado": lado, "semente": semente, "resultado": obtido,
+                                   "disputas": modelo.coletas_disputadas + modelo.reservas.disputas,
+                                   "aprovado": obtido == repetido == paralelo})
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks das operações quentes com verificação da complexidade empírica.")
+    parser.add_argument("filtro", nargs="*", help="executa só os casos cujo nome contém algum destes textos")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=list(TAMANHOS))
+    parser.add_argument("--repeticoes", type=int, default=200)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA)
+    parser.add_argument("--rodadas", type=int, default=RODADAS, help="rodadas por tamanho; vale a menor mediana")
+    parser.add_argument("--json", action="store_true", help="imprime os resultados em JSON")
+    parser.add_argument("--reinicio", action="store_true",
+                        help="compara a vazão de réplicas em mapas pequenos (modelo novo vs. reiniciado)")
+    parser.add_argument("--duas-fases", action="store_true",
+                        help="verifica o passo em duas fases (termina, se repete com a mesma semente e não depende das threads)")
+    args = parser.parse_args(argv)
+
+    if args.duas_fases:
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            resultados = verificar_duas_fases()
+        if args.json:
+            json.dump(resultados, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+        else:
+            for r in resultados:
+                situacao = "ok" if r["aprovado"] else "FALHOU"
+                print(f"{situacao:6} {r['lado']:3}x{r['lado']:<3} semente {r['semente']}  utilidade, entregas, passos "
+                      f"{r['resultado']}  disputas {r['disputas']}")
+        return 0 if all(r["aprovado"] for r in resultados) else 1
+
+    if args.reinicio:
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            resultados = vazao_replicas()
+        if args.json:
+            json.dump(resultados, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+        else:
+            for r in resultados:
+                print(f"{r['lado']:3}x{r['lado']:<3} {r['recursos']:4} recursos  novo {r['replicas_por_s_novo']:8.1f}/s  "
+                      f"reinício {r['replicas_por_s_reinicio']:8.1f}/s  ganho {r['ganho']:.2f}x")
+        return 0
+
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):  # Mensagens dos agentes
+        resultados = executar_casos(args.filtro, sorted(args.tamanhos), args.repeticoes, args.tolerancia, args.rodadas)
+
+    if args.json:
+        json.dump(resultados, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for r in resultados:
+            situacao = "ok" if r["aprovado"] else "FALHOU"
+            tempos = " ".join(f"{t / 1000:8.1f}" for t in r["tempos_ns"].values())
+            print(f"{situacao:6} {r['caso']:48} n^{r['expoente']:.2f} (declarado n^{r['expoente_declarado']})  µs: {tempos}")
+
+    return 0 if all(r["aprovado"] for r in resultados) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from lote import executar_replica
+from simular import MODELOS, valor_parametro
+
+TIPOS_AGENTES = ("num_agentes_reativos", "num_agentes_estado", "num_agentes_objetivos", "num_agentes_cooperativos")
+
+
+def gerar_misturas(total_agentes, incremento=1, minimo=0):
+    """ Todas as divisões de `total_agentes` entre os quatro tipos, em múltiplos de `incremento`. """
+    quantidades = range(minimo, total_agentes + 1, incremento)
+    return [dict(zip(TIPOS_AGENTES, combinacao)) for combinacao in itertools.product(quantidades, repeat=len(TIPOS_AGENTES))
+            if sum(combinacao) == total_agentes]
+
+
+def utilidade_por_passo(resultado):
+    return resultado["utilidade_total"] / max(resultado["passos"], 1)
+
+
+def busca_sucessiva(mapa, misturas, passos_iniciais=100, passos_maximos=3200, replicas_iniciais=1,
+                    replicas_maximas=8, eta=2, processos=None, semente_base=0, cache=None, mundo_compartilhado=False):
+    """
+    Successive halving: avalia todas as misturas em um horizonte curto, mantém a melhor fração 1/eta
+    (por utilidade média por passo), multiplica horizonte e réplicas por eta e repete até sobrar uma mistura
+    ou o horizonte máximo ser atingido. As réplicas usam as mesmas sementes em todas as misturas.
+    Com `mundo_compartilhado`, o mapa é sorteado uma vez e publicado em memória compartilhada para os processos.
+    Retorna as rodadas, a melhor mistura e o custo (em passos simulados) comparado a uma grade completa.
+    """
+    candidatas = [dict(mapa, **mistura) for mistura in misturas]
+    passos, replicas = passos_iniciais, replicas_iniciais
+    rodadas = []
+    custo = 0
+
+    mundo = None
+    if mundo_compartilhado:
+        from mundo_compartilhado import MundoCompartilhado
+        mundo = MundoCompartilhado.publicar(mapa["width"], mapa["height"], mapa["num_recursos"],
+                                            mapa["num_estruturas"], semente_base)
+
+    with contextlib.ExitStack() as pilha:
+        if mundo is not None:
+            pilha.callback(mundo.fechar)
+        executor = pilha.enter_context(ProcessPoolExecutor(max_workers=processos or os.cpu_count() or 1))
+        while True:
+            pontuacoes = _avaliar(executor, candidatas, passos, replicas, semente_base, cache,
+                                  mundo.descritor if mundo is not None else None)
+            custo += len(candidatas) * passos * replicas
+            ordem = sorted(range(len(candidatas)), key=lambda i: -pontuacoes[i])
+            rodadas.append({
+                "passos": passos,
+                "replicas": replicas,
+                "candidatas": len(candidatas),
+                "classificacao": [{"mistura": _mistura(candidatas[i]), "utilidade_por_passo": pontuacoes[i]}
+                                  for i in ordem],
+            })
+
+            if len(candidatas) == 1 or passos >= passos_maximos:
+                break
+            candidatas = [candidatas[i] for i in ordem[:max(1, math.ceil(len(candidatas) / eta))]]
+            passos = min(passos * eta, passos_maximos)
+            replicas = min(replicas * eta, replicas_maximas)
+
+    # Grade completa: todas as misturas no horizonte e número de réplicas da última rodada
+    custo_grade = len(misturas) * passos * replicas
+    melhor = rodadas[-1]["classificacao"][0]
+    return {
+        "melhor": melhor,
+        "rodadas": rodadas,
+        "passos_simulados": custo,
+        "passos_grade_completa": custo_grade,
+        "economia": 1 - custo / custo_grade,
+    }
+
+
+def _avaliar(executor, candidatas, passos, replicas, semente_base, cache, mundo=None):
+    """ Utilidade média por passo de cada candidata, com as réplicas distribuídas entre os processos. """
+    totais = [0.0] * len(candidatas)
+    futuros = {}
+    for i, parametros in enumerate(candidatas):
+        chave = dict(parametros, mundo=mundo["assinatura"]) if mundo else parametros
+        for k in range(replicas):
+            semente = semente_base + k
+            resultado = cache.obter(chave, semente, passos) if cache else None
+            if resultado is not None:
+                totais[i] += utilidade_por_passo(resultado)
+            else:
+                futuros[executor.submit(executar_replica, parametros, semente, passos, mundo)] = (i, chave, semente)
+
+    for futuro, (i, chave, semente) in futuros.items():
+        resultado = futuro.result()
+        if cache:
+            cache.guardar(chave, semente, passos, resultado)
+        totais[i] += utilidade_por_passo(resultado)
+    return [total / replicas for total in totais]
+
+
+def _mistura(parametros):
+    return {tipo: parametros[tipo] for tipo in TIPOS_AGENTES}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Procura a mistura de tipos de agentes com maior utilidade por passo.")
+    parser.add_argument("--total", type=int, default=8, help="número total de agentes")
+    parser.add_argument("--incremento", type=int, default=1, help="granularidade das quantidades por tipo")
+    parser.add_argument("--passos-iniciais", type=int, default=100)
+    parser.add_argument("--passos-maximos", type=int, default=3200)
+    parser.add_argument("--eta", type=int, default=2, help="fração mantida por rodada é 1/eta")
+    parser.add_argument("--processos", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--param", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="parâmetro do mapa (pode ser repetido)")
+    parser.add_argument("--mundo-compartilhado", action="store_true",
+                        help="sorteia o mapa uma vez e o compartilha entre os processos")
+    parser.add_argument("--cache", action="store_true", help="reaproveita réplicas já executadas (.cache_simulacoes)")
+    args = parser.parse_args(argv)
+
+    mapa = {chave: valor for chave, valor in MODELOS["planeta"][2].items() if chave not in TIPOS_AGENTES}
+    for item in args.param:
+        chave, _, valor = item.partition("=")
+        mapa[chave] = valor_parametro(valor)
+
+    cache = None
+    if args.cache:
+        from cache_resultados import CacheResultados
+        cache = CacheResultados()
+
+    # As réplicas rodam nos processos de trabalho, que já desviam os prints dos agentes (lote.executar_replica)
+    resultado = busca_sucessiva(mapa, gerar_misturas(args.total, args.incremento), args.passos_iniciais,
+                                args.passos_maximos, eta=args.eta, processos=args.processos,
+                                semente_base=args.seed, cache=cache,
+                                mundo_compartilhado=args.mundo_compartilhado)
+    json.dump(resultado, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
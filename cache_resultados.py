@@ -0,0 +1,86 @@
+import hashlib
+import json
+import os
+
+DIRETORIO_PROJETO = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos cujo código determina o resultado de uma simulação de PlanetaModelo, incluindo lote.py (reaproveitamento
+# do modelo entre réplicas e séries por passo) e memoria.py (relatório de memória com `memoria`)
+ARQUIVOS_SIMULACAO = ("agentes.py", "objetos.py", "planet_model.py", "exploracao.py", "terminacao.py",
+                      "livro_entregas.py", "registro_agentes.py", "mensagens.py",
+                      "reservas.py", "trilha.py", "duas_fases.py", "encontro.py", "percepcao.py",
+                      "mundo_compartilhado.py", "lote.py", "memoria.py")
+
+
+def hash_codigo_simulacao(arquivos=ARQUIVOS_SIMULACAO):
+    """ Hash do código-fonte da simulação; muda sempre que o código dos agentes muda. """
+    h = hashlib.sha256()
+    for nome in arquivos:
+        h.update(nome.encode())
+        with open(os.path.join(DIRETORIO_PROJETO, nome), "rb") as arquivo:
+            h.update(arquivo.read())
+    return h.hexdigest()
+
+
+class CacheResultados:
+    """ Cache em disco de resultados de execuções, endereçado por conteúdo e com despejo LRU limitado por tamanho. """
+
+    def __init__(self, diretorio=None, tamanho_maximo=256 * 1024 * 1024):
+        self.diretorio = diretorio or os.path.join(DIRETORIO_PROJETO, ".cache_simulacoes")
+        self.tamanho_maximo = tamanho_maximo
+        self.hash_codigo = hash_codigo_simulacao()
+        os.makedirs(self.diretorio, exist_ok=True)
+        self.tamanho_atual = sum(e.stat().st_size for e in self._entradas())
+
+    def chave(self, parametros, semente, passos):
+        conteudo = json.dumps({
+            "parametros": parametros,
+            "semente": semente,
+            "passos": passos,
+            "codigo": self.hash_codigo,
+        }, sort_keys=True)
+        return hashlib.sha256(conteudo.encode()).hexdigest()
+
+    def obter(self, parametros, semente, passos):
+        """ Retorna o resultado guardado ou None; um acerto renova a entrada no LRU. """
+        caminho = self._caminho(self.chave(parametros, semente, passos))
+        try:
+            with open(caminho, encoding="utf-8") as arquivo:
+                resultado = json.load(arquivo)
+            os.utime(caminho)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return resultado
+
+    def guardar(self, parametros, semente, passos, resultado):
+        caminho = self._caminho(self.chave(parametros, semente, passos))
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo)
+        tamanho_anterior = os.path.getsize(caminho) if os.path.exists(caminho) else 0
+        os.replace(temporario, caminho)  # Escrita atômica: leitores nunca veem um arquivo parcial
+
+        self.tamanho_atual += os.path.getsize(caminho) - tamanho_anterior
+        if self.tamanho_atual > self.tamanho_maximo:
+            self._despejar()
+
+    def limpar(self):
+        for entrada in self._entradas():
+            os.remove(entrada.path)
+        self.tamanho_atual = 0
+
+    def _despejar(self):
+        """ Remove as entradas usadas há mais tempo até o cache voltar ao limite. """
+        entradas = sorted(self._entradas(), key=lambda e: e.stat().st_mtime)
+        self.tamanho_atual = sum(e.stat().st_size for e in entradas)
+        for entrada in entradas:
+            if self.tamanho_atual <= self.tamanho_maximo:
+                break
+            self.tamanho_atual -= entrada.stat().st_size
+            os.remove(entrada.path)
+
+    def _entradas(self):
+        return [e for e in os.scandir(self.diretorio) if e.name.endswith(".json")]
+
+    def _caminho(self, chave):
+        return os.path.join(self.diretorio, chave + ".json")
@@ -0,0 +1,102 @@
+# Na fase de decisão, os agentes (em sequência ou em threads, com um executor) só leem estado compartilhado:
+# o grid fica congelado (GradeCongelada), coletas e entregas viram pedidos pendentes, e o que cada agente faria
+# na fronteira de exploração, no barramento de mensagens, na tabela de reservas e nos encontros vai para a sua
+# lista no DiarioEfeitos. Na segunda fase tudo é aplicado em ordem de handle, e cada agente sorteia do próprio
+# gerador, então o resultado não depende da ordem em que as threads rodaram.
+class GradeCongelada:
+    """
+    Visão do grid na fase de decisão do passo em duas fases: as leituras enxergam o grid como estava no início
+    do passo e os movimentos só atualizam `agente.pos`, ficando pendentes até a fase de aplicação.
+    """
+
+    def __init__(self, grade):
+        self.grade = grade
+        self.origens = {}  # agente -> posição no início do passo (só agentes que se moveram)
+
+    def __getattr__(self, nome):
+        return getattr(self.grade, nome)
+
+    def move_agent(self, agente, pos):
+        pos = self.grade.torus_adj(pos)
+        self.origens.setdefault(agente, agente.pos)  # Cada agente só move a si mesmo: não há disputa pela chave
+        agente.pos = pos
+
+    def place_agent(self, agente, pos):
+        raise RuntimeError("o grid não pode ser alterado na fase de decisão")
+
+    def remove_agent(self, agente):
+        raise RuntimeError("o grid não pode ser alterado na fase de decisão; use model.recolher")
+
+    def movimentos(self):
+        """ (agente, origem, destino) dos agentes que mudaram de célula, em ordem de handle. """
+        return [(agente, origem, agente.pos) for agente, origem in sorted(self.origens.items(), key=lambda item: item[0].handle)
+                if agente.pos != origem]
+
+
+def copiar_estado(agente):
+    """ Cópia rasa do estado do agente (listas, conjuntos e dicionários copiados) para desfazer uma decisão. """
+    return {nome: valor.copy() if isinstance(valor, (list, set, dict)) else valor
+            for nome, valor in agente.__dict__.items()}
+
+
+def restaurar_estado(agente, estado):
+    agente.__dict__.clear()
+    agente.__dict__.update(estado)
+
+
+class DiarioEfeitos:
+    """
+    Efeitos pedidos por cada agente na fase de decisão sobre as estruturas compartilhadas. Cada agente só escreve
+    na própria lista; na fase de aplicação os efeitos valem em ordem de handle, e os de quem teve a decisão desfeita
+    são descartados, sem deixar alvos, mensagens ou reservas de uma decisão que não aconteceu.
+    """
+
+    def __init__(self, agentes):
+        ordem = sorted(agentes, key=lambda agente: agente.handle)
+        self.efeitos = {agente: [] for agente in ordem}
+        self.disputas = {agente: [] for agente in ordem}
+
+    def adiar(self, agente, efeito, *args):
+        self.efeitos[agente].append((efeito, args))
+
+    def disputar(self, agente, efeito, *args):
+        """ Efeito que retorna False se conflitar com o de um agente de handle menor (ex.: a mesma célula reservada). """
+        self.disputas[agente].append((efeito, args))
+
+    def resolver_disputas(self, perdedores):
+        """ Aplica os efeitos disputados em ordem de handle; retorna os agentes que perderam alguma disputa. """
+        novos = set()
+        for agente, disputas in self.disputas.items():
+            if agente not in perdedores and any(efeito(*args) is False for efeito, args in disputas):
+                novos.add(agente)
+        return novos
+
+    def aplicar(self, perdedores):
+        for agente, efeitos in self.efeitos.items():
+            if agente not in perdedores:
+                for efeito, args in efeitos:
+                    efeito(*args)
+
+
+def resolver_coletas(coletas):
+    """
+    Resolve coletas do mesmo objeto decididas no mesmo passo: fica com o agente de menor handle.
+    Retorna (coletas vencedoras em ordem de handle do objeto, conjunto de agentes perdedores).
+    """
+    vencedoras = {}
+    perdedores = set()
+    for objeto, agente in coletas:
+        atual = vencedoras.get(objeto.handle)
+        if atual is None:
+            vencedoras[objeto.handle] = (objeto, agente)
+        elif _handle(agente) < _handle(atual[1]):
+            perdedores.add(atual[1])
+            vencedoras[objeto.handle] = (objeto, agente)
+        else:
+            perdedores.add(agente)
+    perdedores.discard(None)
+    return [vencedoras[h] for h in sorted(vencedoras) if vencedoras[h][1] not in perdedores], perdedores
+
+
+def _handle(agente):
+    return agente.handle if agente is not None else -1
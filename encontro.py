@@ -0,0 +1,177 @@
+import heapq
+import itertools
+import math
+from collections import Counter
+
+from agentes import AgenteCooperativo
+
+# Eventos do protocolo de encontro para transporte de estruturas
+PEDIDO = "pedido"  # Um agente parou sobre uma estrutura e pediu ajuda
+ACEITE = "aceite"  # Um cooperativo ocioso foi designado e está a caminho
+CHEGADA = "chegada"  # Um carregador chegou à estrutura e espera, dormindo, os demais
+LEVANTAMENTO = "levantamento"  # Carregadores suficientes: a estrutura sai do grid com quem pediu
+CANCELAMENTO = "cancelamento"  # A espera passou do limite; todos são liberados
+
+
+class Encontro:
+    """ Transporte combinado de uma estrutura: quem pediu, quem está a caminho e quem já chegou. """
+
+    def __init__(self, estrutura, solicitante, prazo):
+        self.estrutura = estrutura
+        self.solicitante = solicitante
+        self.prazo = prazo
+        self.presentes = []  # Carregadores parados na estrutura (o solicitante primeiro)
+        self.a_caminho = {}  # agente -> passo do aceite
+
+    def vagas(self):
+        return self.estrutura.carregadores_necessarios - len(self.presentes) - len(self.a_caminho)
+
+
+class CoordenadorEncontros:
+    """
+    Encontros para transporte de estruturas com `carregadores_necessarios` agentes, guiados por eventos
+    (pedido, aceite, chegada, levantamento): quem espera na estrutura dorme e não é executado pelo modelo,
+    e só as partes envolvidas em cada evento são acordadas. Pedidos sem ajudante ficam na fila até um
+    cooperativo ficar livre; pedidos que esperam mais de `espera_maxima` passos são cancelados.
+    """
+
+    def __init__(self, modelo, raio_ajuda=None, espera_maxima=200):
+        self.modelo = modelo
+        self.raio_ajuda = raio_ajuda  # Distância máxima (em células) de um ajudante; None = qualquer um
+        self.espera_maxima = espera_maxima
+        self.abertos = {}  # estrutura -> Encontro
+        self.por_agente = {}  # agente -> Encontro em que está (a caminho ou presente)
+        self.dormindo = set()  # Agentes parados numa estrutura; o modelo não os executa
+        self.sem_ajudante = {}  # estrutura -> Encontro com vagas sem ajudante, em ordem de pedido
+        self.prazos = []  # heap (passo limite, ordem, encontro)
+        self.ordem = itertools.count()
+        self.eventos = Counter()
+        self.passos_dormindo = 0
+        self.diario = None  # DiarioEfeitos durante a fase de decisão do passo em duas fases
+
+    def limpar(self):
+        self.abertos.clear()
+        self.por_agente.clear()
+        self.dormindo.clear()
+        self.sem_ajudante.clear()
+        self.prazos.clear()
+        self.eventos.clear()
+        self.passos_dormindo = 0
+
+    def pedir(self, estrutura, agente):
+        """
+        O agente está sobre a estrutura: abre um encontro ou entra no que já existe. Retorna False se não couber.
+        Na fase de decisão do passo em duas fases o pedido é aplicado depois, e pode não caber mais.
+        """
+        if estrutura.sendo_transportada or estrutura.transportado or agente in self.por_agente:
+            return False
+        encontro = self.abertos.get(estrutura)
+        if encontro is not None and encontro.vagas() <= 0:
+            return False
+        if self.diario is not None:
+            self.diario.adiar(agente, self.pedir, estrutura, agente)
+            return True
+        if encontro is None:
+            encontro = Encontro(estrutura, agente, self.modelo.passo_atual + self.espera_maxima)
+            self.abertos[estrutura] = encontro
+            heapq.heappush(self.prazos, (encontro.prazo, next(self.ordem), encontro))
+            self.eventos[PEDIDO] += 1
+        self._chegar(encontro, agente)
+        if self.abertos.get(estrutura) is encontro:
+            self._convocar(encontro)
+        return True
+
+    def chegar(self, agente):
+        """ Um ajudante a caminho alcançou a estrutura. """
+        if self.diario is not None:
+            self.diario.adiar(agente, self.chegar, agente)
+            return
+        encontro = self.por_agente.get(agente)
+        if encontro is not None and agente in encontro.a_caminho and agente.pos == encontro.estrutura.pos:
+            del encontro.a_caminho[agente]
+            agente.destino_encontro = None
+            self._chegar(encontro, agente)
+
+    def agente_livre(self, agente):
+        """ Um cooperativo ficou ocioso: atende o pedido mais antigo ao seu alcance, se houver. """
+        if not self.sem_ajudante or not isinstance(agente, AgenteCooperativo) or agente in self.por_agente:
+            return
+        for estrutura, encontro in self.sem_ajudante.items():
+            if self._ao_alcance(agente, estrutura):
+                self._aceitar(encontro, agente)
+                if encontro.vagas() <= 0:
+                    del self.sem_ajudante[estrutura]
+                return
+
+    def antes_do_passo(self, passo):
+        """ Cancela os encontros vencidos e contabiliza os agentes que dormem neste passo. """
+        while self.prazos and self.prazos[0][0] <= passo:
+            _, _, encontro = heapq.heappop(self.prazos)
+            if self.abertos.get(encontro.estrutura) is encontro:
+                self._encerrar(encontro)
+                encontro.estrutura.agentes_transportando.clear()
+                self.eventos[CANCELAMENTO] += 1
+        self.passos_dormindo += len(self.dormindo)
+
+    def relatorio(self):
+        return dict(self.eventos, abertos=len(self.abertos), dormindo=len(self.dormindo),
+                    passos_dormindo=self.passos_dormindo)
+
+    def _chegar(self, encontro, agente):
+        encontro.presentes.append(agente)
+        self.por_agente[agente] = encontro
+        self.eventos[CHEGADA] += 1
+        encontro.estrutura.adicionar_agente_transportador(agente)
+        if encontro.estrutura.sendo_transportada:
+            self._levantar(encontro)
+        else:
+            self.dormindo.add(agente)
+
+    def _convocar(self, encontro):
+        """ Aceita para as vagas os cooperativos ociosos mais próximos; o que faltar espera um agente livre. """
+        vagas = encontro.vagas()
+        if vagas <= 0:
+            return
+        pos = encontro.estrutura.pos
+        candidatos = [agente for agente in self.modelo.registro.ociosos_do_tipo(AgenteCooperativo)
+                      if agente not in self.por_agente and self._ao_alcance(agente, encontro.estrutura)]
+        for agente in heapq.nsmallest(vagas, candidatos,
+                                      key=lambda a: (math.hypot(a.pos[0] - pos[0], a.pos[1] - pos[1]), a.handle)):
+            self._aceitar(encontro, agente)
+        if encontro.vagas() > 0:
+            self.sem_ajudante[encontro.estrutura] = encontro
+
+    def _aceitar(self, encontro, agente):
+        encontro.a_caminho[agente] = self.modelo.passo_atual
+        self.por_agente[agente] = encontro
+        agente.destino_encontro = encontro.estrutura.pos
+        self.eventos[ACEITE] += 1
+
+    def _levantar(self, encontro):
+        """ Todos os carregadores chegaram: quem pediu leva a estrutura para a base e os ajudantes são liberados. """
+        estrutura, solicitante = encontro.estrutura, encontro.solicitante
+        self._encerrar(encontro)
+        solicitante.recurso_atual = estrutura
+        solicitante.carregando_recurso = True
+        self.modelo.recolher(estrutura, solicitante)
+        self.eventos[LEVANTAMENTO] += 1
+
+    def _encerrar(self, encontro):
+        """ Fecha o encontro e acorda todas as partes; ajudantes liberados atendem outros pedidos pendentes. """
+        del self.abertos[encontro.estrutura]
+        self.sem_ajudante.pop(encontro.estrutura, None)
+        liberados = encontro.presentes + list(encontro.a_caminho)
+        for agente in liberados:
+            self.dormindo.discard(agente)
+            del self.por_agente[agente]
+            if isinstance(agente, AgenteCooperativo):
+                agente.destino_encontro = None
+                agente.objetivo_atual = "explorar"
+        for agente in liberados:
+            if agente is not encontro.solicitante:
+                self.agente_livre(agente)
+
+    def _ao_alcance(self, agente, estrutura):
+        if self.raio_ajuda is None:
+            return True
+        return max(abs(agente.pos[0] - estrutura.pos[0]), abs(agente.pos[1] - estrutura.pos[1])) <= self.raio_ajuda
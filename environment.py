@@ -1,5 +1,6 @@
 # environment.py
 from mesa import Agent
+from livro_entregas import LivroEntregas
 
 class Obstacle(Agent):
     def __init__(self, unique_id, model):
@@ -12,10 +13,13 @@ class Base(Agent):
         self.type = "base"
         self.resources = {"crystals": 0, "metals": 0, "structures": 0}
         self.total_utility = 0
+        self.ledger = LivroEntregas()
 
-    def receive_resource(self, resource_type, utility):
+    def receive_resource(self, resource_type, utility, origin=None, agent=None):
         self.resources[resource_type] += 1
         self.total_utility += utility
+        self.ledger.registrar(self.model.schedule.steps, resource_type, utility, origin,
+                              agent.unique_id if agent is not None else None)
 
 class Crystal(Agent):
     def __init__(self, unique_id, model, utility):
@@ -0,0 +1,232 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+
+def quantil_t(probabilidade, graus_liberdade):
+    """
+    Quantil da distribuição t de Student. Até 30 graus de liberdade (onde a parada adaptativa decide)
+    inverte a distribuição exata por Newton; acima, usa a expansão de Cornish-Fisher, com erro < 0,1%.
+
+    >>> round(quantil_t(0.975, 3), 3), round(quantil_t(0.995, 3), 3), round(quantil_t(0.975, 30), 3)
+    (3.182, 5.841, 2.042)
+    """
+    if graus_liberdade == 1:
+        return math.tan(math.pi * (probabilidade - 0.5))
+    if graus_liberdade == 2:
+        return (2 * probabilidade - 1) / math.sqrt(2 * probabilidade * (1 - probabilidade))
+
+    z = NormalDist().inv_cdf(probabilidade)
+    v = graus_liberdade
+    t = (z
+         + (z ** 3 + z) / (4 * v)
+         + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * v ** 2)
+         + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * v ** 3))
+    if v > 30 or v != int(v):
+        return t
+    for _ in range(50):
+        passo = (_acumulada_t(t, v) - probabilidade) / _densidade_t(t, v)
+        t -= passo
+        if abs(passo) < 1e-12 * max(abs(t), 1):
+            break
+    return t
+
+
+def _acumulada_t(t, graus_liberdade):
+    """ Distribuição acumulada da t com graus de liberdade inteiros, pela série finita em cos(θ) (A&S 26.7.3-4). """
+    v = int(graus_liberdade)
+    theta = math.atan(abs(t) / math.sqrt(v))
+    seno, cosseno2 = math.sin(theta), math.cos(theta) ** 2
+    if v % 2:
+        termo, soma = math.cos(theta), 0.0
+        for k in range(1, (v - 1) // 2 + 1):
+            soma += termo
+            termo *= cosseno2 * (2 * k) / (2 * k + 1)
+        dentro = 2 / math.pi * (theta + seno * soma)
+    else:
+        termo, soma = 1.0, 0.0
+        for k in range(1, v // 2 + 1):
+            soma += termo
+            termo *= cosseno2 * (2 * k - 1) / (2 * k)
+        dentro = seno * soma
+    return 0.5 + math.copysign(dentro / 2, t)  # `dentro` = P(|T| < |t|)
+
+
+def _densidade_t(t, graus_liberdade):
+    v = graus_liberdade
+    return math.exp(math.lgamma((v + 1) / 2) - math.lgamma(v / 2) - (v + 1) / 2 * math.log1p(t * t / v)) / math.sqrt(v * math.pi)
+
+
+class EstatisticaCorrente:
+    """ Média e variância acumuladas online (algoritmo de Welford), sem guardar as amostras. """
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+
+    def adicionar(self, valor):
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+
+    def variancia(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def desvio(self):
+        return math.sqrt(self.variancia())
+
+    def meia_largura(self, confianca=0.95):
+        """ Meia largura do intervalo de confiança da média; infinita com menos de duas amostras. """
+        if self.n < 2:
+            return math.inf
+        return quantil_t((1 + confianca) / 2, self.n - 1) * self.desvio() / math.sqrt(self.n)
+
+    def resumo(self, confianca=0.95):
+        meia_largura = self.meia_largura(confianca)
+        return {
+            "n": self.n,
+            "media": self.media,
+            "desvio": self.desvio(),
+            "ic_inferior": self.media - meia_largura,
+            "ic_superior": self.media + meia_largura,
+        }
+
+
+class SerieCorrente:
+    """ Média e variância por passo de séries de várias réplicas (Welford vetorizado); memória O(passos). """
+
+    def __init__(self):
+        self.n = np.zeros(0, dtype=np.int64)
+        self.media = np.zeros(0)
+        self.m2 = np.zeros(0)
+
+    def adicionar(self, valores):
+        valores = np.asarray(valores, dtype=float)
+        k = len(valores)
+        if k > len(self.n):  # Réplicas podem ter séries de comprimentos diferentes
+            falta = k - len(self.n)
+            self.n = np.concatenate([self.n, np.zeros(falta, dtype=np.int64)])
+            self.media = np.concatenate([self.media, np.zeros(falta)])
+            self.m2 = np.concatenate([self.m2, np.zeros(falta)])
+        self.n[:k] += 1
+        delta = valores - self.media[:k]
+        self.media[:k] += delta / self.n[:k]
+        self.m2[:k] += delta * (valores - self.media[:k])
+
+    def desvio(self):
+        return np.sqrt(np.divide(self.m2, self.n - 1, out=np.zeros_like(self.m2), where=self.n > 1))
+
+    def resumo(self, pontos=None):
+        """ Média e desvio por passo; com `pontos`, só passos igualmente espaçados (para relatórios leves). """
+        indices = np.arange(len(self.n))
+        if pontos and len(indices) > pontos:
+            indices = np.unique(np.linspace(0, len(indices) - 1, pontos).round().astype(int))
+        return {
+            "passos": indices.tolist(),
+            "n": self.n[indices].tolist(),
+            "media": self.media[indices].tolist(),
+            "desvio": self.desvio()[indices].tolist(),
+        }
+
+
+class QuantilP2:
+    """ Estimativa de um quantil em fluxo com cinco marcadores (algoritmo P² de Jain e Chlamtac), sem guardar amostras. """
+
+    def __init__(self, probabilidade):
+        self.p = probabilidade
+        self.n = 0
+        self.alturas = []
+        self.posicoes = [1, 2, 3, 4, 5]
+        self.desejadas = [1, 1 + 2 * probabilidade, 1 + 4 * probabilidade, 3 + 2 * probabilidade, 5]
+        self.incrementos = [0, probabilidade / 2, probabilidade, (1 + probabilidade) / 2, 1]
+
+    def adicionar(self, valor):
+        self.n += 1
+        q = self.alturas
+        if self.n <= 5:
+            q.append(valor)
+            q.sort()
+            return
+
+        if valor < q[0]:
+            q[0] = valor
+            k = 0
+        elif valor >= q[4]:
+            q[4] = valor
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= valor < q[i + 1])
+
+        n = self.posicoes
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desejadas[i] += self.incrementos[i]
+
+        for i in (1, 2, 3):
+            d = self.desejadas[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolica = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if q[i - 1] < parabolica < q[i + 1]:
+                    q[i] = parabolica
+                else:  # Fórmula linear quando a parabólica sairia da ordem dos marcadores
+                    q[i] += d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def valor(self):
+        if self.n == 0:
+            return math.nan
+        if self.n <= 5:  # Poucas amostras: quantil direto das guardadas
+            return self.alturas[min(int(round(self.p * (self.n - 1))), self.n - 1)]
+        return self.alturas[2]
+
+
+class EsbocoQuantis:
+    """ Vários quantis P² da mesma métrica. """
+
+    def __init__(self, probabilidades=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        self.quantis = [QuantilP2(p) for p in probabilidades]
+
+    def adicionar(self, valor):
+        for quantil in self.quantis:
+            quantil.adicionar(valor)
+
+    def resumo(self):
+        return {f"p{round(q.p * 100):02d}": q.valor() for q in self.quantis}
+
+
+class AgregadorReplicas:
+    """
+    Agrega online os resultados das réplicas de uma configuração: média/IC e quantis das métricas escalares
+    e média/desvio por passo das séries. As séries são descartadas depois de agregadas.
+    """
+
+    def __init__(self, metricas=("utilidade_total", "recursos_entregues", "passos"),
+                 probabilidades=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        self.metricas = metricas
+        self.estatisticas = {metrica: EstatisticaCorrente() for metrica in metricas}
+        self.esbocos = {metrica: EsbocoQuantis(probabilidades) for metrica in metricas}
+        self.series = {}  # nome -> SerieCorrente
+
+    def adicionar(self, resultado):
+        """ Agrega um resultado; a chave "series" (nome -> valores por passo) é retirada do dicionário. """
+        for metrica in self.metricas:
+            valor = resultado.get(metrica)
+            if isinstance(valor, (int, float)):
+                self.estatisticas[metrica].adicionar(valor)
+                self.esbocos[metrica].adicionar(valor)
+        for nome, valores in resultado.pop("series", {}).items():
+            self.series.setdefault(nome, SerieCorrente()).adicionar(valores)
+
+    def resumo(self, confianca=0.95, pontos_serie=None):
+        return {
+            "metricas": {metrica: dict(self.estatisticas[metrica].resumo(confianca), quantis=self.esbocos[metrica].resumo())
+                         for metrica in self.metricas if self.estatisticas[metrica].n},
+            "series": {nome: serie.resumo(pontos_serie) for nome, serie in self.series.items()},
+        }
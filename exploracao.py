@@ -0,0 +1,124 @@
+class MotorExploracao:
+    """ Mantém a fronteira (limite conhecido/desconhecido) da equipe e distribui alvos de exploração. """
+
+    def __init__(self, largura, altura):
+        self.largura = largura
+        self.altura = altura
+        self.conhecidas = bytearray(largura * altura)  # 1 = célula já visitada por algum agente
+        self.total_conhecidas = 0
+        self.fronteira = set()  # Células desconhecidas vizinhas de células conhecidas
+        self.alvos = {}  # unique_id do agente -> célula da fronteira atribuída
+        self.reservas = {}  # célula da fronteira -> unique_id do agente que a reservou
+        self.diario = None  # DiarioEfeitos durante a fase de decisão do passo em duas fases
+
+    def limpar(self):
+        """ Volta ao mapa todo desconhecido, reaproveitando as estruturas. """
+        self.conhecidas[:] = bytes(len(self.conhecidas))
+        self.total_conhecidas = 0
+        self.fronteira.clear()
+        self.alvos.clear()
+        self.reservas.clear()
+
+    def cobertura(self):
+        """ Fração do mapa já conhecida pela equipe. """
+        return self.total_conhecidas / (self.largura * self.altura)
+
+    def marcar_conhecida(self, pos):
+        """ Registra a visita a uma célula e atualiza a fronteira incrementalmente (O(1)). """
+        x, y = pos
+        indice = x * self.altura + y
+        if self.conhecidas[indice]:
+            return
+
+        self.conhecidas[indice] = 1
+        self.total_conhecidas += 1
+        self.fronteira.discard(pos)
+
+        dono = self.reservas.pop(pos, None)
+        if dono is not None:
+            self.alvos.pop(dono, None)
+
+        for vx in range(max(x - 1, 0), min(x + 2, self.largura)):
+            for vy in range(max(y - 1, 0), min(y + 2, self.altura)):
+                if not self.conhecidas[vx * self.altura + vy]:
+                    self.fronteira.add((vx, vy))
+
+    def proximo_passo(self, agente):
+        """
+        Retorna a próxima posição do agente rumo ao seu alvo na fronteira, ou None se não houver fronteira.
+        Na fase de decisão do passo em duas fases o novo alvo é só escolhido; a reserva vale na fase de aplicação.
+        """
+        alvo = self.alvos.get(agente.unique_id)
+        if alvo is None or alvo not in self.fronteira:
+            if self.diario is not None:
+                alvo = self.escolher_alvo(agente)
+                self.diario.adiar(agente, self._fixar_alvo, agente.unique_id, alvo)
+            else:
+                alvo = self.atribuir_alvo(agente)
+            if alvo is None:
+                return None
+
+        dx, dy = alvo[0] - agente.pos[0], alvo[1] - agente.pos[1]
+        return (agente.pos[0] + (1 if dx > 0 else -1 if dx < 0 else 0),
+                agente.pos[1] + (1 if dy > 0 else -1 if dy < 0 else 0))
+
+    def atribuir_alvo(self, agente):
+        """ Reserva para o agente a célula de fronteira livre mais próxima (distância de Chebyshev). """
+        alvo = self.escolher_alvo(agente)
+        self._fixar_alvo(agente.unique_id, alvo)
+        return alvo
+
+    def escolher_alvo(self, agente):
+        """ Alvo que atribuir_alvo daria ao agente, sem alterar nada (a reserva atual dele conta como livre). """
+        if not self.fronteira:
+            return None
+
+        atual = self.alvos.get(agente.unique_id)
+        proprio = atual if atual is not None and self.reservas.get(atual) == agente.unique_id else None
+        if len(self.fronteira) <= len(self.reservas) - (proprio is not None):
+            # Mais agentes que fronteira: compartilha o alvo mais próximo
+            return min(self.fronteira, key=lambda p: max(abs(p[0] - agente.pos[0]), abs(p[1] - agente.pos[1])))
+        return self._fronteira_livre_mais_proxima(agente.pos, proprio)
+
+    def liberar_alvo(self, agente):
+        """ Desfaz a reserva atual do agente, se houver. """
+        self._fixar_alvo(agente.unique_id, None)
+
+    def _fixar_alvo(self, unique_id, alvo):
+        anterior = self.alvos.pop(unique_id, None)
+        if anterior is not None and self.reservas.get(anterior) == unique_id:
+            del self.reservas[anterior]
+        if alvo is not None:
+            self.alvos[unique_id] = alvo
+            self.reservas.setdefault(alvo, unique_id)
+
+    def _fronteira_livre_mais_proxima(self, pos, proprio=None):
+        """ Busca em anéis crescentes; se os anéis ficarem maiores que a fronteira, varre a fronteira diretamente. """
+        x, y = pos
+        raio_maximo = max(self.largura, self.altura)
+        examinadas = 0
+        for raio in range(1, raio_maximo + 1):
+            if examinadas > len(self.fronteira):
+                break
+            for celula in self._anel(x, y, raio):
+                examinadas += 1
+                if celula in self.fronteira and (celula not in self.reservas or celula == proprio):
+                    return celula
+
+        livres = [p for p in self.fronteira if p not in self.reservas or p == proprio]
+        return min(livres, key=lambda p: max(abs(p[0] - x), abs(p[1] - y)))
+
+    def _anel(self, x, y, raio):
+        """ Gera as células dentro do grid a exatamente `raio` de distância de Chebyshev de (x, y). """
+        x0, x1 = x - raio, x + raio
+        y0, y1 = y - raio, y + raio
+        for cx in range(max(x0, 0), min(x1, self.largura - 1) + 1):
+            if y0 >= 0:
+                yield (cx, y0)
+            if y1 < self.altura:
+                yield (cx, y1)
+        for cy in range(max(y0 + 1, 0), min(y1 - 1, self.altura - 1) + 1):
+            if x0 >= 0:
+                yield (x0, cy)
+            if x1 < self.largura:
+                yield (x1, cy)
@@ -0,0 +1,100 @@
+from array import array
+
+
+class LivroEntregas:
+    """ Registro de entregas na base: totais correntes em O(1) e histórico guardado em arrays compactos. """
+
+    def __init__(self):
+        self.limpar()
+
+    def limpar(self):
+        # Histórico, uma posição por entrega
+        self.passos = array("l")
+        self.tipos = array("B")
+        self.utilidades = array("d")
+        self.origens_x = array("l")
+        self.origens_y = array("l")
+        self.agentes = array("l")
+
+        # Nomes internados para caber nos arrays
+        self.nomes_tipos = []
+        self.nomes_agentes = []
+        self._indice_tipo = {}
+        self._indice_agente = {}
+
+        # Totais correntes
+        self.quantidade = 0
+        self.utilidade_total = 0
+        self.quantidade_por_tipo = {}
+        self.utilidade_por_tipo = {}
+        self.quantidade_por_agente = {}
+        self.utilidade_por_agente = {}
+
+        # _antes_do_passo[p] = utilidade entregue em passos anteriores a p (soma de prefixos por passo)
+        self._antes_do_passo = array("d")
+
+    def registrar(self, passo, tipo, utilidade, origem=None, agente=None):
+        """ Registra uma entrega; os passos devem chegar em ordem não decrescente. """
+        while len(self._antes_do_passo) <= passo:
+            self._antes_do_passo.append(self.utilidade_total)
+
+        self.passos.append(passo)
+        self.tipos.append(self._internar(tipo, self.nomes_tipos, self._indice_tipo))
+        self.utilidades.append(utilidade)
+        self.origens_x.append(origem[0] if origem else -1)
+        self.origens_y.append(origem[1] if origem else -1)
+        self.agentes.append(self._internar(agente, self.nomes_agentes, self._indice_agente) if agente is not None else -1)
+
+        self.quantidade += 1
+        self.utilidade_total += utilidade
+        self.quantidade_por_tipo[tipo] = self.quantidade_por_tipo.get(tipo, 0) + 1
+        self.utilidade_por_tipo[tipo] = self.utilidade_por_tipo.get(tipo, 0) + utilidade
+        if agente is not None:
+            self.quantidade_por_agente[agente] = self.quantidade_por_agente.get(agente, 0) + 1
+            self.utilidade_por_agente[agente] = self.utilidade_por_agente.get(agente, 0) + utilidade
+
+    def utilidade_ultimos_passos(self, k, passo_atual):
+        """ Utilidade entregue nos passos [passo_atual - k, passo_atual], sem percorrer o histórico. """
+        return self.utilidade_total - self._utilidade_antes_do_passo(passo_atual - k)
+
+    def vazao(self, k, passo_atual):
+        """ Utilidade média por passo na janela dos últimos `k` passos. """
+        return self.utilidade_ultimos_passos(k, passo_atual) / k if k > 0 else 0.0
+
+    def serie_utilidade(self, passos):
+        """ Utilidade acumulada ao fim de cada um dos `passos` primeiros passos (constante depois da última entrega). """
+        return array("d", (self._utilidade_antes_do_passo(t + 1) for t in range(passos)))
+
+    def serie_entregas(self, passos):
+        """ Quantidade de entregas em cada um dos `passos` primeiros passos. """
+        contagem = array("l", [0]) * passos
+        for passo in self.passos:
+            if passo < passos:
+                contagem[passo] += 1
+        return contagem
+
+    def registros(self):
+        """ Reconstrói as entregas como dicionários (percorre o histórico; uso em análises). """
+        for i in range(self.quantidade):
+            yield {
+                "passo": self.passos[i],
+                "tipo": self.nomes_tipos[self.tipos[i]],
+                "utilidade": self.utilidades[i],
+                "pos": (self.origens_x[i], self.origens_y[i]) if self.origens_x[i] >= 0 else None,
+                "agente": self.nomes_agentes[self.agentes[i]] if self.agentes[i] >= 0 else None,
+            }
+
+    def _utilidade_antes_do_passo(self, passo):
+        if passo <= 0:
+            return 0
+        if passo >= len(self._antes_do_passo):
+            return self.utilidade_total
+        return self._antes_do_passo[passo]
+
+    @staticmethod
+    def _internar(nome, nomes, indice):
+        posicao = indice.get(nome)
+        if posicao is None:
+            posicao = indice[nome] = len(nomes)
+            nomes.append(nome)
+        return posicao
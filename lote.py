@@ -0,0 +1,162 @@
+import contextlib
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from estatisticas import AgregadorReplicas, EstatisticaCorrente
+
+
+# Mundos compartilhados já anexados neste processo de trabalho (nome do bloco -> MundoCompartilhado)
+_mundos_anexados = {}
+
+# Último modelo construído neste processo, reaproveitado (PlanetaModelo.reiniciar) pela réplica seguinte
+# com os mesmos parâmetros e mundo: (chave, modelo)
+_modelo_reutilizavel = [None, None]
+
+
+def executar_replica(parametros, semente, passos, mundo=None, series=False):
+    """
+    Executa uma réplica de PlanetaModelo (em um processo de trabalho) e retorna seu resultado.
+    `mundo` é o descritor de um MundoCompartilhado, anexado uma única vez por processo.
+    Com `series`, o resultado traz a utilidade acumulada e as entregas de cada passo (reconstruídas do livro).
+    Réplicas seguidas da mesma configuração reiniciam o modelo anterior em vez de construir outro.
+    """
+    from planet_model import PlanetaModelo
+
+    if mundo is not None:
+        if mundo["nome"] not in _mundos_anexados:
+            from mundo_compartilhado import MundoCompartilhado
+            _mundos_anexados[mundo["nome"]] = MundoCompartilhado.anexar(mundo)
+        mundo = _mundos_anexados[mundo["nome"]]
+
+    with contextlib.redirect_stdout(sys.stderr):  # Mensagens dos agentes não vão para a saída do processo principal
+        chave = (repr(sorted(parametros.items())), id(mundo))
+        modelo = _modelo_reutilizavel[1] if _modelo_reutilizavel[0] == chave else None
+        if modelo is not None:
+            modelo.reiniciar(semente)
+        else:
+            modelo = PlanetaModelo(seed=semente, mundo=mundo, **parametros)
+            _modelo_reutilizavel[:] = [chave, modelo]
+        resultado = modelo.executar(passos)
+    if series:
+        livro = modelo.base.livro
+        resultado["series"] = {"utilidade_acumulada": livro.serie_utilidade(passos).tolist(),
+                               "entregas": livro.serie_entregas(passos).tolist()}
+    resultado["semente"] = semente
+    return resultado
+
+
+class _Configuracao:
+    """ Estado do sequenciamento de réplicas de uma configuração. """
+
+    def __init__(self, indice, parametros):
+        self.indice = indice
+        self.parametros = parametros
+        self.estatistica = EstatisticaCorrente()
+        self.agregador = AgregadorReplicas()
+        self.resultados = []
+        self.enviadas = 0
+        self.pendentes = 0
+        self.concluida = False
+        self.convergiu = False
+
+
+def executar_adaptativo(configuracoes, passos, metrica="utilidade_total", largura_alvo=None,
+                        largura_relativa=0.1, confianca=0.95, min_replicas=3, max_replicas=50,
+                        processos=None, semente_base=0, cache=None, mundo=None, series=False,
+                        guardar_resultados=True, pontos_serie=None):
+    """
+    Executa réplicas de cada configuração incrementalmente, parando quando o intervalo de confiança
+    de `metrica` atinge a largura alvo (absoluta ou relativa à média) ou após `max_replicas`.
+    Trabalhadores liberados são realocados para as configurações ainda mais ruidosas.
+    As sementes são compartilhadas entre configurações (números aleatórios comuns).
+    Com um `CacheResultados`, réplicas já executadas são lidas do disco sem ocupar trabalhadores.
+    Com `mundo` (descritor de MundoCompartilhado), todas as réplicas usam o mesmo mapa em memória compartilhada.
+    Cada configuração é agregada online (AgregadorReplicas); com `series`, também as séries por passo, que
+    são descartadas após a agregação. Com `guardar_resultados=False` nenhum resultado de réplica é mantido,
+    e a memória por configuração fica O(passos) qualquer que seja o número de réplicas.
+    """
+    estados = [_Configuracao(i, dict(parametros)) for i, parametros in enumerate(configuracoes)]
+
+    def chave_cache(estado):
+        """ O mapa compartilhado não é derivado da semente e as séries mudam o resultado: ambos entram na chave. """
+        chave = dict(estado.parametros, mundo=mundo["assinatura"]) if mundo else dict(estado.parametros)
+        if series:
+            chave["series"] = True
+        return chave
+
+    def largura_desejada(estado):
+        if largura_alvo is not None:
+            return largura_alvo
+        return largura_relativa * abs(estado.estatistica.media)
+
+    def ruido(estado):
+        """ Quanto o intervalo atual excede o alvo; configurações sem réplicas suficientes vêm primeiro. """
+        if estado.estatistica.n + estado.pendentes < min_replicas:
+            return math.inf
+        largura = 2 * estado.estatistica.meia_largura(confianca)
+        return largura / max(largura_desejada(estado), 1e-12)
+
+    def proxima_configuracao():
+        candidatas = [e for e in estados if not e.concluida and e.enviadas < max_replicas]
+        if not candidatas:
+            return None
+        return max(candidatas, key=lambda e: (ruido(e), -e.enviadas))
+
+    def registrar(estado, resultado):
+        estado.agregador.adicionar(resultado)  # Retira as séries do resultado
+        if guardar_resultados:
+            estado.resultados.append(resultado)
+        estado.estatistica.adicionar(resultado[metrica])
+        if estado.concluida:
+            return
+        n = estado.estatistica.n
+        if n >= min_replicas and 2 * estado.estatistica.meia_largura(confianca) <= largura_desejada(estado):
+            estado.concluida = True
+            estado.convergiu = True
+        elif n >= max_replicas:
+            estado.concluida = True
+
+    capacidade = processos or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=capacidade) as executor:
+        em_execucao = {}
+
+        def enviar():
+            while len(em_execucao) < capacidade:
+                estado = proxima_configuracao()
+                if estado is None:
+                    return
+                semente = semente_base + estado.enviadas
+                estado.enviadas += 1
+
+                resultado = cache.obter(chave_cache(estado), semente, passos) if cache else None
+                if resultado is not None:
+                    registrar(estado, resultado)
+                    continue
+
+                futuro = executor.submit(executar_replica, estado.parametros, semente, passos, mundo, series)
+                em_execucao[futuro] = (estado, semente)
+                estado.pendentes += 1
+
+        enviar()
+        while em_execucao:
+            concluidos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                estado, semente = em_execucao.pop(futuro)
+                estado.pendentes -= 1
+                resultado = futuro.result()
+                if cache:
+                    cache.guardar(chave_cache(estado), semente, passos, resultado)
+                registrar(estado, resultado)
+            enviar()
+
+    return [{
+        "parametros": estado.parametros,
+        "metrica": metrica,
+        "replicas": estado.estatistica.n,
+        "convergiu": estado.convergiu,
+        **estado.estatistica.resumo(confianca),
+        "agregado": estado.agregador.resumo(confianca, pontos_serie),
+        **({"resultados": estado.resultados} if guardar_resultados else {}),
+    } for estado in estados]
@@ -0,0 +1,152 @@
+import os
+import sys
+import tracemalloc
+from collections import deque
+
+from mesa import Agent
+
+# Arquivo-fonte -> subsistema, para atribuir as alocações vistas pelo tracemalloc
+ARQUIVOS_SUBSISTEMAS = {
+    "agentes.py": "agentes",
+    "objetos.py": "objetos",
+    "planet_model.py": "modelo",
+    "livro_entregas.py": "livro_entregas",
+    "registro_agentes.py": "registro",
+    "mensagens.py": "filas_mensagens",
+    "exploracao.py": "exploracao",
+    "reservas.py": "reservas",
+    "trilha.py": "trilha",
+    "encontro.py": "encontros",
+    "percepcao.py": "percepcao",
+}
+
+
+def tamanho_estrutura(objeto, _vistos=None):
+    """ Bytes de um contêiner e do seu conteúdo, sem descer em agentes (que pertencem a outros subsistemas). """
+    vistos = _vistos if _vistos is not None else set()
+    if id(objeto) in vistos or isinstance(objeto, Agent):
+        return 0
+    vistos.add(id(objeto))
+
+    tamanho = sys.getsizeof(objeto)
+    if isinstance(objeto, dict):
+        for chave, valor in objeto.items():
+            tamanho += tamanho_estrutura(chave, vistos) + tamanho_estrutura(valor, vistos)
+    elif isinstance(objeto, (list, tuple, set, frozenset, deque)):
+        for item in objeto:
+            tamanho += tamanho_estrutura(item, vistos)
+    return tamanho
+
+
+def _medir(*estruturas):
+    """ (bytes, itens) somados de várias estruturas. """
+    vistos = set()
+    return (sum(tamanho_estrutura(e, vistos) for e in estruturas),
+            sum(len(e) for e in estruturas))
+
+
+def medir_subsistemas(modelo):
+    """ Bytes e número de itens das estruturas que crescem durante a execução de um PlanetaModelo. """
+    bdi = modelo.agente_bdi
+    medidas = {
+        "bdi_crencas": _medir(bdi.beliefs, bdi.intentions, bdi.invalidadas, bdi.sujos, bdi.aguardando, bdi.designados),
+        "memoria_agentes": _medir(*[getattr(a, "historico_movimento", ()) for a in modelo.agentes_ativos]),
+        "filas_mensagens": _medir(modelo.mensagens.filas, modelo.mensagens.enviadas, modelo.mensagens.lote),
+        "registro": _medir(modelo.registro.por_id, modelo.registro.handles, modelo.registro.entidades),
+        "livro_entregas": _medir(*[getattr(modelo.base.livro, nome) for nome in (
+            "passos", "tipos", "utilidades", "origens_x", "origens_y", "agentes", "_antes_do_passo",
+            "quantidade_por_agente", "utilidade_por_agente")]),
+    }
+    if modelo.exploracao:
+        medidas["exploracao"] = _medir(modelo.exploracao.conhecidas, modelo.exploracao.fronteira,
+                                       modelo.exploracao.alvos, modelo.exploracao.reservas)
+    if modelo.reservas:
+        medidas["reservas"] = _medir(modelo.reservas.ocupacao, modelo.reservas.arestas,
+                                     modelo.reservas.reservas_agente, modelo.reservas.por_passo)
+    if modelo.encontros:
+        medidas["encontros"] = _medir(modelo.encontros.abertos, modelo.encontros.por_agente,
+                                      modelo.encontros.sem_ajudante, modelo.encontros.prazos)
+    if modelo.percepcao:
+        medidas["percepcao"] = _medir(modelo.percepcao.ladrilhos, modelo.percepcao.consultas_lote)
+    if modelo.gravador:
+        medidas["trilha"] = _medir(modelo.gravador.eventos, modelo.gravador.quadros, modelo.gravador.indice_quadros)
+    return {nome: {"bytes": b, "itens": n} for nome, (b, n) in medidas.items()}
+
+
+class MonitorMemoria:
+    """
+    Amostra a memória por subsistema a cada `intervalo` passos e sinaliza as estruturas que só crescem. Guarda só
+    as últimas `janela_crescimento` amostras; o tracemalloc ligado pelo monitor é desligado em `parar`, que o
+    modelo chama ao montar o resultado da execução.
+    """
+
+    def __init__(self, intervalo=1000, usar_tracemalloc=True, janela_crescimento=5, tolerancia=0.05):
+        self.intervalo = intervalo
+        self.usar_tracemalloc = usar_tracemalloc
+        self.janela_crescimento = janela_crescimento
+        self.tolerancia = tolerancia
+        self.amostras = deque(maxlen=janela_crescimento)
+        self.total_amostras = 0
+        self._iniciou_tracemalloc = False
+
+    def apos_passo(self, modelo):
+        if modelo.passo_atual % self.intervalo == 0:
+            self.amostrar(modelo)
+
+    def amostrar(self, modelo):
+        if self.usar_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+
+        amostra = {"passo": modelo.passo_atual, "subsistemas": medir_subsistemas(modelo)}
+        if tracemalloc.is_tracing():
+            por_arquivo = {}
+            for estatistica in tracemalloc.take_snapshot().statistics("filename"):
+                nome = os.path.basename(estatistica.traceback[0].filename)
+                if nome in ARQUIVOS_SUBSISTEMAS:
+                    subsistema = ARQUIVOS_SUBSISTEMAS[nome]
+                    por_arquivo[subsistema] = por_arquivo.get(subsistema, 0) + estatistica.size
+            amostra["tracemalloc"] = por_arquivo
+            amostra["tracemalloc_total"] = tracemalloc.get_traced_memory()[0]
+        self.amostras.append(amostra)
+        self.total_amostras += 1
+        return amostra
+
+    def parar(self):
+        """ Desliga o tracemalloc se foi o monitor que o ligou; a próxima amostra volta a ligá-lo. """
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+    def limpar(self):
+        self.parar()
+        self.amostras.clear()
+        self.total_amostras = 0
+
+    def crescimento_ilimitado(self):
+        """ Subsistemas que cresceram em todas as últimas `janela_crescimento` amostras, acima da tolerância. """
+        if len(self.amostras) < self.janela_crescimento:
+            return []
+        recentes = list(self.amostras)
+        sinalizados = []
+        for nome in recentes[-1]["subsistemas"]:
+            serie = [a["subsistemas"].get(nome, {"bytes": 0})["bytes"] for a in recentes]
+            if all(b > a for a, b in zip(serie, serie[1:])) and serie[-1] > serie[0] * (1 + self.tolerancia):
+                sinalizados.append(nome)
+        return sinalizados
+
+    def relatorio(self):
+        if not self.amostras:
+            return {}
+        return dict(self.amostras[-1], amostras=self.total_amostras, crescimento_ilimitado=self.crescimento_ilimitado())
+
+    def texto(self):
+        """ Relatório curto em HTML para o painel do servidor. """
+        relatorio = self.relatorio()
+        if not relatorio:
+            return "Memória: sem amostras ainda."
+        linhas = [f"Memória no passo {relatorio['passo']}:"]
+        for nome, medida in sorted(relatorio["subsistemas"].items(), key=lambda item: -item[1]["bytes"]):
+            alerta = " (crescendo sem limite)" if nome in relatorio["crescimento_ilimitado"] else ""
+            linhas.append(f"{nome}: {medida['bytes'] / 1024:.1f} KiB, {medida['itens']} itens{alerta}")
+        return "<br>".join(linhas)
@@ -0,0 +1,70 @@
+from collections import deque, namedtuple
+
+# Tipos de mensagem
+AVISTAMENTO_RECURSO = 0
+AVISTAMENTO_ESTRUTURA = 1
+RECURSO_REMOVIDO = 2
+
+# `dado` leva (tipo, utilidade) nos avistamentos de recurso e None nas demais mensagens
+Mensagem = namedtuple("Mensagem", ["tipo", "pos", "origem", "dado"])
+
+
+class BarramentoMensagens:
+    """ Barramento agentes -> BDI: filas limitadas por agente, deduplicação na origem e entrega em lote uma vez por passo. """
+
+    def __init__(self, capacidade_fila=256):
+        self.capacidade_fila = capacidade_fila
+        self.filas = {}  # unique_id -> deque de Mensagem ainda não descarregadas
+        self.enviadas = {}  # unique_id -> conjunto de (tipo, pos) presentes na fila
+        self.lote = []  # Mensagens descarregadas na base, aguardando a entrega do passo
+        self.descartadas = 0
+        self.diario = None  # DiarioEfeitos durante a fase de decisão do passo em duas fases
+
+    def publicar(self, agente, tipo, pos, dado=None):
+        """ Enfileira uma mensagem do agente; retorna False se ela já estava na fila (True na fase de decisão). """
+        if self.diario is not None:  # Entra na fila na fase de aplicação, em ordem de handle
+            self.diario.adiar(agente, self._publicar, agente, tipo, pos, dado)
+            return True
+        return self._publicar(agente, tipo, pos, dado)
+
+    def _publicar(self, agente, tipo, pos, dado):
+        chave = (tipo, pos)
+        enviadas = self.enviadas.setdefault(agente.unique_id, set())
+        if chave in enviadas:
+            return False
+
+        fila = self.filas.setdefault(agente.unique_id, deque())
+        if len(fila) >= self.capacidade_fila:  # Fila cheia: descarta a mensagem mais antiga
+            antiga = fila.popleft()
+            enviadas.discard((antiga.tipo, antiga.pos))
+            self.descartadas += 1
+
+        fila.append(Mensagem(tipo, pos, agente.unique_id, dado))
+        enviadas.add(chave)
+        return True
+
+    def pendentes(self, agente):
+        return len(self.filas.get(agente.unique_id, ()))
+
+    def descarregar(self, agente):
+        """ Move a fila do agente para o lote do passo (o agente está na base). """
+        if self.diario is not None:
+            self.diario.adiar(agente, self.descarregar, agente)
+            return
+        fila = self.filas.get(agente.unique_id)
+        if fila:
+            self.lote.extend(fila)
+            fila.clear()
+            self.enviadas[agente.unique_id].clear()
+
+    def entregar(self, destinatario):
+        """ Entrega de uma só vez todas as mensagens descarregadas neste passo. """
+        if self.lote:
+            lote, self.lote = self.lote, []
+            destinatario.receber_mensagens(lote)
+
+    def limpar(self):
+        self.filas.clear()
+        self.enviadas.clear()
+        self.lote = []
+        self.descartadas = 0
@@ -0,0 +1,128 @@
+import hashlib
+import random
+from multiprocessing import shared_memory
+
+import numpy as np
+
+TIPOS_RECURSO = ("Cristal", "Metal")
+UTILIDADES = {"Cristal": 10, "Metal": 20}
+
+# Camadas guardadas no bloco de memória compartilhada: nome -> dtype
+CAMADAS = (
+    ("recurso_x", np.int32),
+    ("recurso_y", np.int32),
+    ("recurso_tipo", np.uint8),  # Índice em TIPOS_RECURSO
+    ("recurso_utilidade", np.int32),
+    ("estrutura_x", np.int32),
+    ("estrutura_y", np.int32),
+)
+
+
+class MundoCompartilhado:
+    """
+    Sorteio de um mapa de PlanetaModelo (tipo, utilidade e posição dos recursos, posição das estruturas)
+    publicado uma vez em memória compartilhada e anexado somente para leitura pelos processos de trabalho, que
+    assim usam o mesmo mapa sem sorteá-lo nem recebê-lo serializado. Use `descritor` (pequeno e serializável)
+    para anexar o mesmo mundo em outro processo. O bloco tem poucos bytes por objeto; cada modelo ainda cria
+    seus próprios objetos Recurso e Estrutura e seu grid, que são objetos Python e não cabem nele, então a
+    memória de cada processo continua crescendo com o tamanho do mapa.
+    """
+
+    def __init__(self, descritor, memoria, dono):
+        self.descritor = descritor
+        self.memoria = memoria
+        self.dono = dono
+        self.largura = descritor["largura"]
+        self.altura = descritor["altura"]
+        self.base_pos = tuple(descritor["base_pos"])
+        for nome, dtype in CAMADAS:
+            deslocamento, forma = descritor["camadas"][nome]
+            camada = np.ndarray(forma, dtype=dtype, buffer=memoria.buf, offset=deslocamento)
+            camada.flags.writeable = False  # Ninguém altera o mundo depois de publicado
+            setattr(self, nome, camada)
+
+    @property
+    def num_recursos(self):
+        return len(self.recurso_x)
+
+    @property
+    def num_estruturas(self):
+        return len(self.estrutura_x)
+
+    @classmethod
+    def publicar(cls, width, height, num_recursos, num_estruturas, seed=None, base_pos=(0, 0)):
+        """ Sorteia o mapa (como PlanetaModelo faria) e o publica em um novo bloco de memória compartilhada. """
+        gerador = random.Random(seed)
+        ocupadas = {base_pos}
+
+        def posicao_livre():
+            while True:
+                pos = (gerador.randint(0, width - 1), gerador.randint(0, height - 1))
+                if pos not in ocupadas:
+                    ocupadas.add(pos)
+                    return pos
+
+        recursos = []
+        for _ in range(num_recursos):
+            pos = posicao_livre()
+            tipo = gerador.choice(TIPOS_RECURSO)
+            recursos.append((pos[0], pos[1], TIPOS_RECURSO.index(tipo), UTILIDADES[tipo]))
+        estruturas = [posicao_livre() for _ in range(num_estruturas)]
+
+        valores = {
+            "recurso_x": [r[0] for r in recursos],
+            "recurso_y": [r[1] for r in recursos],
+            "recurso_tipo": [r[2] for r in recursos],
+            "recurso_utilidade": [r[3] for r in recursos],
+            "estrutura_x": [e[0] for e in estruturas],
+            "estrutura_y": [e[1] for e in estruturas],
+        }
+        arrays = {nome: np.asarray(valores[nome], dtype=dtype) for nome, dtype in CAMADAS}
+
+        camadas, tamanho = {}, 0
+        for nome, _ in CAMADAS:
+            tamanho = -(-tamanho // 8) * 8  # Alinha cada camada em 8 bytes
+            camadas[nome] = (tamanho, arrays[nome].shape)
+            tamanho += arrays[nome].nbytes
+
+        memoria = shared_memory.SharedMemory(create=True, size=max(tamanho, 1))
+        for nome, _ in CAMADAS:
+            deslocamento, forma = camadas[nome]
+            destino = np.ndarray(forma, dtype=arrays[nome].dtype, buffer=memoria.buf, offset=deslocamento)
+            destino[...] = arrays[nome]
+
+        assinatura = hashlib.sha256(bytes(memoria.buf[:tamanho])).hexdigest()[:16]
+        descritor = {"nome": memoria.name, "largura": width, "altura": height, "base_pos": list(base_pos),
+                     "camadas": camadas, "assinatura": assinatura}
+        return cls(descritor, memoria, dono=True)
+
+    @classmethod
+    def anexar(cls, descritor):
+        """ Anexa (somente leitura) um mundo publicado por outro processo. """
+        # Os processos de trabalho herdam o rastreador de recursos de quem publicou, então o bloco só é apagado
+        # pelo dono (fechar) ou, se ele morrer sem fechar, quando o último processo terminar
+        return cls(descritor, shared_memory.SharedMemory(name=descritor["nome"]), dono=False)
+
+    def recursos(self):
+        """ (índice, tipo, utilidade, pos) de cada recurso do mapa. """
+        for i in range(self.num_recursos):
+            yield (i, TIPOS_RECURSO[self.recurso_tipo[i]], int(self.recurso_utilidade[i]),
+                   (int(self.recurso_x[i]), int(self.recurso_y[i])))
+
+    def estruturas(self):
+        for i in range(self.num_estruturas):
+            yield i, (int(self.estrutura_x[i]), int(self.estrutura_y[i]))
+
+    def fechar(self):
+        """ Solta as visões e desanexa; o dono também apaga o bloco. """
+        for nome, _ in CAMADAS:
+            setattr(self, nome, None)
+        self.memoria.close()
+        if self.dono:
+            self.memoria.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
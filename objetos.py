@@ -1,44 +1,83 @@
 from mesa import Agent
+from livro_entregas import LivroEntregas
 
 class Recurso(Agent):
     """Representa um recurso disponível no ambiente."""
     def __init__(self, unique_id, model, tipo, utilidade, pos):
         super().__init__(unique_id, model)
+        self.pos = pos
+        self.reiniciar(tipo, utilidade, pos)
+
+    def reiniciar(self, tipo, utilidade, pos):
+        """ Redefine o recurso para ser reposicionado em `pos` (o modelo o coloca no grid). """
         self.tipo = tipo
         self.utilidade = utilidade
-        self.pos = pos
+        self.pos_origem = pos
         self.transportado = False
+        self.entregue = False
 
 class Estrutura(Agent):
     """Representa uma estrutura que requer múltiplos agentes para transporte."""
-    def __init__(self, unique_id, model, pos):
+    def __init__(self, unique_id, model, pos, carregadores_necessarios=2):
         super().__init__(unique_id, model)
         self.tipo = "Estrutura"
         self.utilidade = 50
         self.pos = pos
+        self.carregadores_necessarios = carregadores_necessarios
         self.agentes_transportando = set()
+        self.reiniciar(pos)
+
+    def reiniciar(self, pos):
+        """ Redefine a estrutura para ser reposicionada em `pos` (o modelo a coloca no grid). """
+        self.pos_origem = pos
+        self.agentes_transportando.clear()
         self.sendo_transportada = False
+        self.transportado = False
+        self.entregue = False
 
     def adicionar_agente_transportador(self, agente):
         self.agentes_transportando.add(agente)
-        if len(self.agentes_transportando) >= 2:
+        if len(self.agentes_transportando) >= self.carregadores_necessarios and not self.sendo_transportada:
             self.sendo_transportada = True
+            self.model.agente_bdi.invalidar(self.pos)  # Estrutura em transporte deixa de ser um alvo marcado
 
 class BaseInicial(Agent):
     """Representa a base onde os recursos são entregues."""
     def __init__(self, unique_id, model):
         super().__init__(unique_id, model)
-        self.recursos_entregues = []
-
-    def registrar_recurso(self, recurso):
-        if not recurso.transportado:
-            self.recursos_entregues.append({
-                "tipo": recurso.tipo,
-                "utilidade": recurso.utilidade,
-                "pos": recurso.pos
-            })
-            self.model.grid.remove_agent(recurso)
+        self.livro = LivroEntregas()
+
+    @property
+    def recursos_entregues(self):
+        """ Lista das entregas como dicionários (reconstruída a partir do livro). """
+        return list(self.livro.registros())
+
+    def registrar_recurso(self, recurso, agente=None):
+        # `transportado` é marcado na coleta (PlanetaModelo.recolher); `entregue` evita registrar o mesmo objeto duas vezes
+        if self.model.em_decisao:  # Passo em duas fases: a entrega é aplicada depois das decisões
+            self.model.entregas_pendentes.append((recurso, agente))
+            return
+        if not getattr(recurso, "entregue", False):
+            self.livro.registrar(self.model.passo_atual, recurso.tipo, recurso.utilidade,
+                                 getattr(recurso, "pos_origem", recurso.pos),
+                                 agente.unique_id if agente is not None else None)
+            self.model.recolher(recurso)
+            if self.model.gravador and agente is not None:
+                self.model.gravador.entrega(self.model.passo_atual, agente, recurso.utilidade)
             recurso.transportado = True
+            recurso.entregue = True
+            if agente is not None:
+                self.model.registro.marcar_ocioso(agente)
+                self.model.agente_bdi.marcar_sujo(agente)
+                if self.model.encontros:
+                    self.model.encontros.agente_livre(agente)
+
+    def quantidade_entregue(self):
+        return self.livro.quantidade
 
     def utilidade_total(self):
-        return sum(r["utilidade"] for r in self.recursos_entregues)
+        return self.livro.utilidade_total
+
+    def vazao(self, k):
+        """ Utilidade média por passo nos últimos `k` passos. """
+        return self.livro.vazao(k, self.model.passo_atual)
@@ -0,0 +1,176 @@
+import numpy as np
+
+# Camadas de contagem mantidas pela percepção, uma por tipo de objeto no grid
+TIPOS = ("Cristal", "Metal", "Estrutura")
+
+
+class Percepcao:
+    """
+    Sensores de raio r (vizinhança de Moore: quadrado de lado 2r + 1) para os agentes de PlanetaModelo.
+    Camadas de contagem por tipo e de utilidade dos recursos são atualizadas a cada objeto colocado ou
+    recolhido. As somas de retângulos vêm de tabelas de áreas somadas mantidas por blocos de `bloco` x `bloco`
+    células: prefixos locais de cada bloco, faixas acumuladas por coluna e por linha de blocos e uma tabela
+    pequena sobre os totais dos blocos. No início de cada passo só os blocos alterados (e suas faixas) são
+    refeitos, então o custo acompanha as mudanças, não a área do grid; cada consulta custa O(1) e enxerga
+    o grid do início do passo. As células ocupadas ficam também num índice por ladrilhos, sempre atual,
+    que lista as de um raio em O(resultado + ladrilhos do quadrado).
+    """
+
+    def __init__(self, largura, altura, ladrilho=8, bloco=32):
+        self.largura = largura
+        self.altura = altura
+        self.ladrilho = ladrilho
+        self.bloco = bloco
+        self.blocos_x = -(-largura // bloco)
+        self.blocos_y = -(-altura // bloco)
+        # Última coluna/linha de cada bloco, para ler os totais dos prefixos locais
+        self.fim_x = np.minimum((np.arange(self.blocos_x) + 1) * bloco, largura) - 1
+        self.fim_y = np.minimum((np.arange(self.blocos_y) + 1) * bloco, altura) - 1
+        self.camadas = {}
+        self.locais = {}  # prefixo inclusivo dentro do bloco de cada célula
+        self.colunas = {}  # [x, j]: células da coluna de blocos de x, do início do bloco até x, abaixo da linha de blocos j
+        self.linhas = {}  # [i, y]: células da linha de blocos de y, do início do bloco até y, à esquerda da coluna de blocos i
+        self.totais = {}  # tabela exclusiva sobre os totais dos blocos
+        for camada in TIPOS + ("utilidade",):
+            self.camadas[camada] = np.zeros((largura, altura), dtype=np.int64)
+            self.locais[camada] = np.zeros((largura, altura), dtype=np.int64)
+            self.colunas[camada] = np.zeros((largura, self.blocos_y + 1), dtype=np.int64)
+            self.linhas[camada] = np.zeros((self.blocos_x + 1, altura), dtype=np.int64)
+            self.totais[camada] = np.zeros((self.blocos_x + 1, self.blocos_y + 1), dtype=np.int64)
+        self.ladrilhos = {}  # (lx, ly) -> {pos: tipo} dos objetos naquele ladrilho
+        self.alterados = set()  # (camada, bx, by) dos blocos com células alteradas desde a última atualização
+        self.consultas_lote = {}  # (passo, raio) -> resultado de perceber_todos, válido só no próprio passo
+
+    def limpar(self):
+        for tabelas in (self.camadas, self.locais, self.colunas, self.linhas, self.totais):
+            for tabela in tabelas.values():
+                tabela.fill(0)
+        self.ladrilhos.clear()
+        self.alterados.clear()
+        self.consultas_lote.clear()
+
+    def adicionar(self, objeto):
+        self._atualizar(objeto.pos, objeto.tipo, objeto.utilidade, 1)
+        self.ladrilhos.setdefault(self._ladrilho(objeto.pos), {})[objeto.pos] = objeto.tipo
+
+    def remover(self, objeto):
+        self._atualizar(objeto.pos, objeto.tipo, objeto.utilidade, -1)
+        celulas = self.ladrilhos.get(self._ladrilho(objeto.pos))
+        if celulas is not None:
+            celulas.pop(objeto.pos, None)
+
+    def _atualizar(self, pos, tipo, utilidade, sinal):
+        bloco = (pos[0] // self.bloco, pos[1] // self.bloco)
+        self.camadas[tipo][pos] += sinal
+        self.alterados.add((tipo,) + bloco)
+        if tipo != "Estrutura":
+            self.camadas["utilidade"][pos] += sinal * utilidade
+            self.alterados.add(("utilidade",) + bloco)
+
+    def _ladrilho(self, pos):
+        return pos[0] // self.ladrilho, pos[1] // self.ladrilho
+
+    def atualizar(self):
+        """ Refaz os blocos alterados e suas faixas; o modelo chama no início de cada passo. """
+        if not self.alterados:
+            return
+        por_camada = {}
+        for camada, bx, by in self.alterados:
+            por_camada.setdefault(camada, set()).add((bx, by))
+        for camada, blocos in por_camada.items():
+            celulas, local = self.camadas[camada], self.locais[camada]
+            for bx, by in blocos:
+                xs = slice(bx * self.bloco, min((bx + 1) * self.bloco, self.largura))
+                ys = slice(by * self.bloco, min((by + 1) * self.bloco, self.altura))
+                np.cumsum(np.cumsum(celulas[xs, ys], axis=0), axis=1, out=local[xs, ys])
+            for bx in {bx for bx, _ in blocos}:  # Coluna de blocos: soma acumulada dos blocos de baixo para cima
+                xs = slice(bx * self.bloco, min((bx + 1) * self.bloco, self.largura))
+                np.cumsum(local[xs][:, self.fim_y], axis=1, out=self.colunas[camada][xs, 1:])
+            for by in {by for _, by in blocos}:  # Linha de blocos: soma acumulada da esquerda para a direita
+                ys = slice(by * self.bloco, min((by + 1) * self.bloco, self.altura))
+                np.cumsum(local[self.fim_x, ys], axis=0, out=self.linhas[camada][1:, ys])
+            totais = local[np.ix_(self.fim_x, self.fim_y)]
+            np.cumsum(np.cumsum(totais, axis=0), axis=1, out=self.totais[camada][1:, 1:])
+        self.alterados.clear()
+        self.consultas_lote.clear()
+
+    def _somar(self, camadas, x, y, raio):
+        """ Somas de cada camada nos quadrados de raio `raio` em torno de (x, y) (arrays), pelos quatro cantos. """
+        cantos = []
+        for cx, cy, sinal in ((x + raio + 1, y + raio + 1, 1), (x - raio, y + raio + 1, -1),
+                              (x + raio + 1, y - raio, -1), (x - raio, y - raio, 1)):
+            cx, cy = np.clip(cx, 0, self.largura), np.clip(cy, 0, self.altura)
+            bx, rx = np.divmod(cx, self.bloco)
+            by, ry = np.divmod(cy, self.bloco)
+            # Prefixo de (cx, cy) = blocos inteiros + faixa da coluna + faixa da linha + parte local do bloco
+            cantos.append((sinal, bx, by, np.maximum(cx - 1, 0), np.maximum(cy - 1, 0), rx > 0, ry > 0))
+        somas = {}
+        for camada in camadas:
+            soma = 0
+            for sinal, bx, by, xa, ya, tem_x, tem_y in cantos:
+                soma = soma + sinal * (self.totais[camada][bx, by]
+                                       + np.where(tem_x, self.colunas[camada][xa, by], 0)
+                                       + np.where(tem_y, self.linhas[camada][bx, ya], 0)
+                                       + np.where(tem_x & tem_y, self.locais[camada][xa, ya], 0))
+            somas[camada] = soma
+        return somas
+
+    def _prefixo_celula(self, camada, x, y):
+        """ Soma das células com coordenadas < (x, y), para uma única posição, sem o custo de montar arrays. """
+        bx, rx = divmod(x, self.bloco)
+        by, ry = divmod(y, self.bloco)
+        soma = self.totais[camada][bx, by]
+        if rx:
+            soma += self.colunas[camada][x - 1, by]
+        if ry:
+            soma += self.linhas[camada][bx, y - 1]
+            if rx:
+                soma += self.locais[camada][x - 1, y - 1]
+        return int(soma)
+
+    def _somar_quadrado(self, camada, pos, raio):
+        x0, y0 = max(pos[0] - raio, 0), max(pos[1] - raio, 0)
+        x1, y1 = min(pos[0] + raio + 1, self.largura), min(pos[1] + raio + 1, self.altura)
+        return (self._prefixo_celula(camada, x1, y1) - self._prefixo_celula(camada, x0, y1)
+                - self._prefixo_celula(camada, x1, y0) + self._prefixo_celula(camada, x0, y0))
+
+    def contar(self, pos, raio, tipo=None):
+        """ Quantidade de objetos (de `tipo`, ou recursos de qualquer tipo) a até `raio` células de `pos`. """
+        tipos = (tipo,) if tipo else ("Cristal", "Metal")
+        return sum(self._somar_quadrado(t, pos, raio) for t in tipos)
+
+    def utilidade(self, pos, raio):
+        """ Utilidade somada dos recursos a até `raio` células de `pos`. """
+        return self._somar_quadrado("utilidade", pos, raio)
+
+    def celulas(self, pos, raio, tipo=None):
+        """ Células com objetos (de `tipo`, ou recursos de qualquer tipo) a até `raio` células de `pos`. """
+        tipos = (tipo,) if tipo else ("Cristal", "Metal")
+        x0, y0 = max(pos[0] - raio, 0), max(pos[1] - raio, 0)
+        x1, y1 = min(pos[0] + raio, self.largura - 1), min(pos[1] + raio, self.altura - 1)
+        encontradas = []
+        for lx in range(x0 // self.ladrilho, x1 // self.ladrilho + 1):
+            for ly in range(y0 // self.ladrilho, y1 // self.ladrilho + 1):
+                for celula, tipo_celula in self.ladrilhos.get((lx, ly), {}).items():
+                    if tipo_celula in tipos and x0 <= celula[0] <= x1 and y0 <= celula[1] <= y1:
+                        encontradas.append(celula)
+        return encontradas
+
+    def contar_lote(self, posicoes, raio, tipo=None):
+        """ `contar` para várias posições de uma vez (vetorizado); retorna um array na ordem de `posicoes`. """
+        tipos = (tipo,) if tipo else ("Cristal", "Metal")
+        xs, ys = np.asarray(posicoes, dtype=np.int64).reshape(-1, 2).T
+        return sum(self._somar(tipos, xs, ys, raio).values())
+
+    def perceber_todos(self, agentes, passo, raio):
+        """
+        Leitura dos sensores de todos os agentes no passo: unique_id -> {"Cristal", "Metal", "utilidade"}.
+        Calculada uma vez por (passo, raio) com consultas vetorizadas sobre as tabelas do início do passo.
+        """
+        chave = (passo, raio)
+        if chave not in self.consultas_lote:
+            xs, ys = np.asarray([agente.pos for agente in agentes], dtype=np.int64).reshape(-1, 2).T
+            colunas = self._somar(("Cristal", "Metal", "utilidade"), xs, ys, raio)
+            self.consultas_lote = {chave: {
+                agente.unique_id: {t: int(colunas[t][i]) for t in colunas} for i, agente in enumerate(agentes)}}
+        return self.consultas_lote[chave]
@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+from collections import Counter
+
+# Arquivos cujas funções representam o trabalho de um agente (ou objeto) do modelo
+ARQUIVOS_AGENTES = ("agentes.py", "objetos.py")
+
+
+class PerfiladorAmostral:
+    """
+    Amostra a pilha da thread da simulação a cada `intervalo` segundos enquanto o modelo executa os passos
+    em [inicio, fim) e grava pilhas colapsadas (formato do flamegraph.pl / speedscope).
+    Intervalos abaixo do intervalo de troca do GIL (sys.getswitchinterval, 5 ms) encarecem a simulação sem
+    aumentar muito a resolução, porque a thread de amostragem precisa do GIL para ler a pilha.
+    """
+
+    def __init__(self, inicio, fim, intervalo=0.005, caminho=None, funcao_raiz="PlanetaModelo.step"):
+        self.inicio = inicio
+        self.fim = fim
+        self.intervalo = intervalo
+        self.caminho = caminho
+        self.funcao_raiz = funcao_raiz  # As pilhas começam nesta função; amostras fora dela são ignoradas
+        self.pilhas = Counter()
+        self.amostras = 0
+        self.ignoradas = 0
+        self.concluido = False
+        self._alvo = None
+        self._parar = threading.Event()
+        self._thread = None
+
+    def inicio_passo(self, modelo):
+        if self._thread is None and not self.concluido and self.inicio <= modelo.passo_atual < self.fim:
+            self._alvo = threading.get_ident()
+            self._thread = threading.Thread(target=self._amostrar, name="perfilador", daemon=True)
+            self._thread.start()
+
+    def fim_passo(self, modelo):
+        if self._thread is not None and modelo.passo_atual >= self.fim:
+            self.parar()
+
+    def parar(self):
+        """ Encerra a amostragem e grava o arquivo, se houver caminho. """
+        if self._thread is None:
+            return
+        self._parar.set()
+        self._thread.join()
+        self._thread = None
+        self.concluido = True
+        if self.caminho:
+            self.salvar(self.caminho)
+
+    def _amostrar(self):
+        while not self._parar.wait(self.intervalo):
+            quadro = sys._current_frames().get(self._alvo)
+            pilha = self._pilha(quadro) if quadro is not None else None
+            if pilha:
+                self.pilhas[pilha] += 1
+                self.amostras += 1
+            else:
+                self.ignoradas += 1
+
+    def _pilha(self, quadro):
+        """ Pilha colapsada da função raiz até o quadro atual ("arquivo:Classe.metodo;..."), ou None. """
+        nomes = []
+        while quadro is not None:
+            nome = _nome_funcao(quadro)
+            nomes.append(f"{os.path.basename(quadro.f_code.co_filename)}:{nome}")
+            if nome == self.funcao_raiz:
+                nomes.reverse()
+                return ";".join(nomes)
+            quadro = quadro.f_back
+        return None
+
+    def salvar(self, caminho):
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            for pilha, contagem in self.pilhas.most_common():
+                arquivo.write(f"{pilha} {contagem}\n")
+
+    def por_agente(self):
+        """ Amostras atribuídas ao método de agente mais interno de cada pilha (Classe.metodo -> amostras). """
+        contagens = Counter()
+        for pilha, contagem in self.pilhas.items():
+            dono = "modelo"
+            for quadro in pilha.split(";"):
+                arquivo, _, nome = quadro.partition(":")
+                if arquivo in ARQUIVOS_AGENTES and "<" not in nome:
+                    # Compreensões e funções internas contam para o método que as chamou, logo abaixo na pilha
+                    dono = nome
+            contagens[dono] += contagem
+        return dict(contagens.most_common())
+
+    def relatorio(self):
+        return {
+            "passos": [self.inicio, self.fim],
+            "intervalo_s": self.intervalo,
+            "amostras": self.amostras,
+            "amostras_fora_do_passo": self.ignoradas,
+            "por_agente": self.por_agente(),
+            "arquivo": self.caminho,
+        }
+
+
+def _nome_funcao(quadro):
+    """
+    Nome Classe.metodo da função do quadro. Para métodos, a classe é a do `self` que os executa, não a que os
+    define: um método herdado (ex.: de MovimentoPlanejado) conta para cada tipo de agente. As demais funções usam
+    o nome qualificado (só o nome antes do Python 3.11, que não tem `co_qualname`).
+    """
+    codigo = quadro.f_code
+    if codigo.co_argcount and codigo.co_varnames[0] == "self":
+        instancia = quadro.f_locals.get("self")
+        if instancia is not None:
+            return f"{type(instancia).__name__}.{codigo.co_name}"
+    return getattr(codigo, "co_qualname", codigo.co_name)
@@ -1,102 +1,506 @@
 from mesa import Model
 from mesa.space import MultiGrid
 import random
+import time
 from objetos import Recurso, BaseInicial, Estrutura
 from agentes import AgenteReativoSimples, AgenteBaseadoEmEstado, AgenteBaseadoEmObjetivos, AgenteCooperativo, AgenteBDI
+from terminacao import TodosRecursosEntregues
+from registro_agentes import RegistroAgentes
+from mensagens import BarramentoMensagens, RECURSO_REMOVIDO
+
+# Opções de cada subsistema de PlanetaModelo e seus valores padrão. Os subsistemas opcionais ficam desligados
+# com None e são ligados com True (padrões) ou um dicionário que altera parte das opções; seus módulos só são
+# importados quando ligados.
+OPCOES = {
+    "mensagens": {"capacidade_fila": 256},  # Sempre ligado
+    "crencas": {"ttl": None, "maximo": None},  # Sempre ligado: validade (passos) e máximo de crenças do BDI
+    "reservas": {"vagas_base": 4},  # Rotas cooperativas com reservas espaço-tempo
+    "sincrono": {"executor": None},  # Passo em duas fases; `executor` (ex.: ThreadPoolExecutor) distribui as decisões
+    "transporte": {"carregadores": 2, "raio_ajuda": None},  # Estruturas levadas por vários agentes (encontro.py)
+    "percepcao": {"raio": 5},  # Sensores de raio r (percepcao.py)
+    "tempo_real": {"orcamento_passo": 0.05},  # Segundos por passo
+    "memoria": {"intervalo": 100},  # Relatório de memória a cada tantos passos
+}
+SEMPRE_LIGADOS = ("mensagens", "crencas")
+
+
+def opcoes_subsistema(nome, valor):
+    """ Opções efetivas de um subsistema a partir do argumento do modelo; None se ele estiver desligado. """
+    if valor is None or valor is False:
+        if nome not in SEMPRE_LIGADOS:
+            return None
+        valor = {}
+    opcoes = dict(OPCOES[nome])
+    if valor is not True:
+        desconhecidas = set(valor) - set(opcoes)
+        if desconhecidas:
+            raise ValueError(f"opções desconhecidas para {nome}: {sorted(desconhecidas)}")
+        opcoes.update(valor)
+    return opcoes
+
+
+class GradePlaneta(MultiGrid):
+    """ MultiGrid que avisa a camada de ocupação do raster (se algum quadro já foi pedido) de cada célula alterada. """
+
+    def __init__(self, width, height, torus):
+        super().__init__(width, height, torus)
+        self.ocupacao = None
+
+    def place_agent(self, agent, pos):
+        super().place_agent(agent, pos)
+        if self.ocupacao is not None:
+            self.ocupacao.atualizar(self, agent.pos)
+
+    def remove_agent(self, agent):
+        pos = agent.pos
+        super().remove_agent(agent)
+        if self.ocupacao is not None:
+            self.ocupacao.atualizar(self, pos)
 
 class PlanetaModelo(Model):
-    def __init__(self, width, height, num_recursos, num_estruturas, num_agentes_reativos, num_agentes_estado, num_agentes_objetivos, num_agentes_cooperativos):
+    def __init__(self, width, height, num_recursos, num_estruturas, num_agentes_reativos, num_agentes_estado,
+                 num_agentes_objetivos, num_agentes_cooperativos, seed=None, exploracao_fronteira=True,
+                 condicoes_parada=None, mundo=None, mensagens=None, crencas=None, reservas=None, sincrono=None,
+                 transporte=None, percepcao=None, tempo_real=None, memoria=None):
+        """ Os argumentos de `mensagens` a `memoria` são as opções de cada subsistema (ver OPCOES). """
         super().__init__()
-        self.grid = MultiGrid(width, height, False)
+        mensagens, crencas, reservas, sincrono, transporte, percepcao, tempo_real, memoria = (
+            opcoes_subsistema(nome, valor) for nome, valor in (
+                ("mensagens", mensagens), ("crencas", crencas), ("reservas", reservas), ("sincrono", sincrono),
+                ("transporte", transporte), ("percepcao", percepcao), ("tempo_real", tempo_real), ("memoria", memoria)))
+        if seed is not None:
+            self.reset_randomizer(seed)  # Agentes e posicionamento usam só self.random, nunca o gerador global
+        self.grid = GradePlaneta(width, height, False)
         self.width = width
         self.height = height
+        self.num_recursos = num_recursos
+        self.num_estruturas = num_estruturas
+        self.passo_atual = 0
+        self.running = True
+        self.motivo_parada = None
+
+        # Registro das entidades vivas: handles inteiros e visões por tipo
+        self.registro = RegistroAgentes()
+        self.agents_by_id = self.registro.por_id
 
-        # Dicionário para acesso rápido aos objetos e agentes pelo ID
-        self.agents_by_id = {}
+        # Mensagens dos agentes para o BDI, entregues em lote a cada passo
+        self.mensagens = BarramentoMensagens(mensagens["capacidade_fila"])
 
-        # Base Inicial
+        # Base Inicial e Agente BDI (ambos na base)
         self.base_pos = (0, 0)
         self.base = BaseInicial("BASE", self)
-        self.grid.place_agent(self.base, self.base_pos)
-        self.agents_by_id[self.base.unique_id] = self.base
+        self.agente_bdi = AgenteBDI("BDI", self, crencas["ttl"], crencas["maximo"])
+
+        # Mapa estático publicado em memória compartilhada (MundoCompartilhado): recursos e estruturas vêm dele
+        self.mundo = mundo
+        if mundo is not None:
+            if (mundo.largura, mundo.altura, mundo.num_recursos, mundo.num_estruturas) != (width, height, num_recursos, num_estruturas):
+                raise ValueError("o mundo compartilhado não corresponde às dimensões e quantidades do modelo")
+
+        # Recursos leves (Cristal e Metal) e estruturas; tipo e posição são definidos em _montar
+        self.recursos = [Recurso(f"R_{i}", self, None, 0, None) for i in range(num_recursos)]
+        carregadores = transporte["carregadores"] if transporte else 2
+        self.estruturas = [Estrutura(f"E_{i}", self, None, carregadores) for i in range(num_estruturas)]
+
+        # Agentes de cada tipo, posicionados em _montar
+        self.agentes_reativos = [AgenteReativoSimples(f"A_{i}", self, self.base_pos) for i in range(num_agentes_reativos)]
+        self.agentes_baseados_estado = [AgenteBaseadoEmEstado(f"AE_{i}", self, self.base_pos) for i in range(num_agentes_estado)]
+        self.agentes_baseados_objetivos = [AgenteBaseadoEmObjetivos(f"ABO_{i}", self, self.base_pos) for i in range(num_agentes_objetivos)]
+        self.agentes_cooperativos = [AgenteCooperativo(f"AC_{i}", self, self.base_pos) for i in range(num_agentes_cooperativos)]
+
+        # Lista fixa dos agentes que agem a cada passo
+        self.agentes_ativos = self.agentes_reativos + self.agentes_baseados_estado + self.agentes_baseados_objetivos + self.agentes_cooperativos
+
+        # Fronteira de exploração compartilhada pela equipe
+        self.exploracao = None
+        if exploracao_fronteira:
+            from exploracao import MotorExploracao
+            self.exploracao = MotorExploracao(width, height)
+
+        # Sensores de raio `percepcao["raio"]` (percepcao.py); os agentes cooperativos os usam para achar recursos próximos
+        self.raio_percepcao = percepcao["raio"] if percepcao else None
+        self.percepcao = None
+        if self.raio_percepcao:
+            from percepcao import Percepcao
+            self.percepcao = Percepcao(width, height)
+
+        # Reservas espaço-tempo para rotas sem colisão; a base atende `reservas["vagas_base"]` agentes por passo
+        self.reservas = None
+        if reservas:
+            from reservas import TabelaReservas
+            self.reservas = TabelaReservas(width, height, {self.base_pos: reservas["vagas_base"]})
 
-        # Adiciona o Agente BDI na base
-        self.agente_bdi = AgenteBDI("BDI", self)
+        # Gravação opcional da execução (ver gravar_trilha)
+        self.gravador = None
+
+        # Perfilador amostral opcional para uma faixa de passos (ver perfilar)
+        self.perfilador = None
+
+        # Relatório de memória por subsistema a cada `memoria["intervalo"]` passos
+        self.monitor_memoria = None
+        if memoria:
+            from memoria import MonitorMemoria
+            self.monitor_memoria = MonitorMemoria(memoria["intervalo"])
+
+        # Passo em duas fases: todos decidem sobre o grid do início do passo e depois as ações são aplicadas.
+        # `sincrono["executor"]` (ex.: ThreadPoolExecutor) distribui as decisões; None decide em sequência,
+        # com o mesmo resultado (ver duas_fases.py).
+        self.modo_sincrono = bool(sincrono)
+        self.executor_decisoes = sincrono["executor"] if sincrono else None
+        self.em_decisao = False
+        self.coletas_pendentes = []  # (objeto, agente) pedidos na fase de decisão
+        self.entregas_pendentes = []  # (recurso, agente) pedidos na fase de decisão
+        self.coletas_disputadas = 0
+
+        # Transporte de estruturas por `transporte["carregadores"]` agentes, combinado por eventos (encontro.py);
+        # desligado, os agentes baseados em estado carregam estruturas sozinhos
+        self.encontros = None
+        if transporte:
+            from encontro import CoordenadorEncontros
+            self.encontros = CoordenadorEncontros(self, transporte["raio_ajuda"])
+
+        # Modo de tempo real: cada passo tem `tempo_real["orcamento_passo"]` segundos; o planejamento do BDI para
+        # no prazo e continua no passo seguinte, e `executar` mantém o ritmo de um passo por orçamento
+        self.orcamento_passo = tempo_real["orcamento_passo"] if tempo_real else None
+        self.prazo_passo = None
+        self.tempo_real = self._novo_tempo_real() if self.orcamento_passo else None
+
+        # Condições de parada verificadas ao fim de cada passo
+        self.condicoes_parada = [TodosRecursosEntregues()] if condicoes_parada is None else list(condicoes_parada)
+
+        self._montar()
+
+    def _montar(self):
+        """ Coloca base, recursos, estruturas e agentes no grid vazio, sorteando as posições sempre na mesma ordem. """
+        self.grid.place_agent(self.base, self.base_pos)
+        self.registro.adicionar(self.base)
         self.grid.place_agent(self.agente_bdi, self.base_pos)
-        self.agents_by_id[self.agente_bdi.unique_id] = self.agente_bdi
+        self.registro.adicionar(self.agente_bdi)
 
-        # Recursos leves (Cristal e Metal)
-        for i in range(num_recursos):
-            pos = self.gerar_posicao_valida()
-            tipo_recurso = random.choice(["Cristal", "Metal"])
-            utilidade = {"Cristal": 10, "Metal": 20}[tipo_recurso]
-            recurso = Recurso(f"R_{i}", self, tipo_recurso, utilidade, pos)
+        recursos = self.mundo.recursos() if self.mundo is not None else self.sortear_recursos(self.num_recursos)
+        for i, tipo_recurso, utilidade, pos in recursos:
+            recurso = self.recursos[i]
+            recurso.reiniciar(tipo_recurso, utilidade, pos)
             self.grid.place_agent(recurso, pos)
-            self.agents_by_id[recurso.unique_id] = recurso
+            self.registro.adicionar(recurso)
+            if self.percepcao:
+                self.percepcao.adicionar(recurso)
 
-        # Estruturas
-        self.estruturas = []
-        for i in range(num_estruturas):
-            pos = self.gerar_posicao_valida()
-            estrutura = Estrutura(f"E_{i}", self, pos)
-            self.estruturas.append(estrutura)
+        posicoes_estruturas = self.mundo.estruturas() if self.mundo is not None else ((i, self.gerar_posicao_valida()) for i in range(self.num_estruturas))
+        for i, pos in posicoes_estruturas:
+            estrutura = self.estruturas[i]
+            estrutura.reiniciar(pos)
             self.grid.place_agent(estrutura, pos)
-            self.agents_by_id[estrutura.unique_id] = estrutura
+            self.registro.adicionar(estrutura)
+            if self.percepcao:
+                self.percepcao.adicionar(estrutura)
 
-        # Agentes reativos simples
-        self.agentes_reativos = []
-        for i in range(num_agentes_reativos):
-            pos = self.gerar_posicao_valida()
-            agente = AgenteReativoSimples(f"A_{i}", self, self.base_pos)
-            self.agentes_reativos.append(agente)
-            self.grid.place_agent(agente, pos)
-            self.agents_by_id[agente.unique_id] = agente
-
-        # Agentes baseados em estado
-        self.agentes_baseados_estado = []
-        for i in range(num_agentes_estado):
-            pos = self.gerar_posicao_valida()
-            agente = AgenteBaseadoEmEstado(f"AE_{i}", self, self.base_pos)
-            self.agentes_baseados_estado.append(agente)
-            self.grid.place_agent(agente, pos)
-            self.agents_by_id[agente.unique_id] = agente
-
-        # Agentes baseados em objetivos
-        self.agentes_baseados_objetivos = []
-        for i in range(num_agentes_objetivos):
-            pos = self.gerar_posicao_valida()
-            agente = AgenteBaseadoEmObjetivos(f"ABO_{i}", self, self.base_pos)
-            self.agentes_baseados_objetivos.append(agente)
-            self.grid.place_agent(agente, pos)
-            self.agents_by_id[agente.unique_id] = agente
-
-        # Agentes cooperativos
-        self.agentes_cooperativos = []
-        for i in range(num_agentes_cooperativos):
+        for agente in self.agentes_ativos:
+            self.grid.place_agent(agente, self.gerar_posicao_valida())
+            self.registro.adicionar(agente, ocioso=True)
+            self.agente_bdi.marcar_sujo(agente)  # Todos começam sem missão
+
+        if self.exploracao:
+            self.exploracao.marcar_conhecida(self.base_pos)
+            for agente in self.agentes_ativos:
+                self.exploracao.marcar_conhecida(agente.pos)
+
+        if self.modo_sincrono:
+            self.semear_agentes()
+
+        for condicao in self.condicoes_parada:
+            condicao.reiniciar()
+
+    def reiniciar(self, seed=None):
+        """
+        Volta ao estado inicial reaproveitando grid, objetos e agentes (útil entre réplicas em mapas pequenos,
+        onde construir o modelo domina a execução). Com `seed`, o resultado é o mesmo de um modelo novo
+        construído com essa semente.
+        """
+        if seed is not None:
+            self.reset_randomizer(seed)
+        for entidade in self.registro.entidades:
+            if entidade is not None and entidade.pos is not None:
+                self.grid.remove_agent(entidade)
+        self.registro.limpar()
+
+        self.passo_atual = 0
+        self.running = True
+        self.motivo_parada = None
+        for agente in self.agentes_ativos:
+            agente.reiniciar()
+        self.agente_bdi.reiniciar()
+        self.base.livro.limpar()
+        self.mensagens.limpar()
+        if self.exploracao:
+            self.exploracao.limpar()
+        if self.reservas:
+            self.reservas.limpar()
+        if self.encontros:
+            self.encontros.limpar()
+        if self.percepcao:
+            self.percepcao.limpar()
+        if self.monitor_memoria:
+            self.monitor_memoria.limpar()
+        self.gravador = None
+        self.perfilador = None
+        self.em_decisao = False
+        self.coletas_pendentes.clear()
+        self.entregas_pendentes.clear()
+        self.coletas_disputadas = 0
+        if self.tempo_real:
+            self.tempo_real = self._novo_tempo_real()
+
+        self._montar()
+
+    def semear_agentes(self):
+        """
+        Passo em duas fases: um gerador por agente, derivado da semente do modelo e do handle, para que os sorteios
+        de cada um não dependam da ordem em que as decisões rodam.
+        """
+        for agente in self.agentes_ativos:
+            agente.gerador = random.Random(f"{self._seed}/{agente.handle}")
+
+    def _novo_tempo_real(self):
+        return {"orcamento_s": self.orcamento_passo, "passos": 0, "estouros": 0, "maior_passo_s": 0.0,
+                "tempo_total_s": 0.0, "planejamentos_adiados": 0, "passos_com_adiamento": 0}
+
+    def sortear_recursos(self, num_recursos):
+        """ Sorteia (índice, tipo, utilidade, pos) de cada recurso; gerado sob demanda para ver os já posicionados. """
+        for i in range(num_recursos):
             pos = self.gerar_posicao_valida()
-            agente = AgenteCooperativo(f"AC_{i}", self, self.base_pos)
-            self.agentes_cooperativos.append(agente)
-            self.grid.place_agent(agente, pos)
-            self.agents_by_id[agente.unique_id] = agente
+            tipo_recurso = self.random.choice(["Cristal", "Metal"])
+            yield i, tipo_recurso, {"Cristal": 10, "Metal": 20}[tipo_recurso], pos
 
     def gerar_posicao_valida(self):
         """ Retorna uma posição aleatória disponível no grid. """
         while True:
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
+            x = self.random.randint(0, self.width - 1)
+            y = self.random.randint(0, self.height - 1)
             if (x, y) != self.base_pos and not self.grid.get_cell_list_contents((x, y)):
                 return (x, y)
 
     def get_agent_by_id(self, unique_id):
         """ Retorna um agente ou objeto pelo seu ID. """
-        return self.agents_by_id.get(unique_id, None)
+        return self.registro.obter(unique_id)
+
+    def recolher(self, objeto, agente=None):
+        """
+        Marca um recurso ou estrutura como coletado e o retira do grid e do registro; o agente que coletou deixa
+        de estar ocioso.
+        """
+        if self.em_decisao:  # Aplicada na segunda fase do passo, depois de resolvidas as disputas
+            self.coletas_pendentes.append((objeto, agente))
+            return
+        objeto.transportado = True
+        if objeto.pos is not None:
+            if agente is not None:
+                self.mensagens.publicar(agente, RECURSO_REMOVIDO, objeto.pos)
+            self.agente_bdi.invalidar(objeto.pos)  # O BDI não manda mais ninguém a uma célula vazia
+            if self.gravador:
+                self.gravador.coleta(self.passo_atual, objeto, agente)
+            if self.percepcao:
+                self.percepcao.remover(objeto)
+            self.grid.remove_agent(objeto)
+        self.registro.remover(objeto)
+        if agente is not None:
+            self.registro.marcar_ocioso(agente, False)
 
     def step(self):
         """ Executa um ciclo de simulação, processando informações dos agentes. """
-        for agente in self.agentes_reativos + self.agentes_baseados_estado + self.agentes_baseados_objetivos + self.agentes_cooperativos:
+        if not self.running:
+            return
+
+        if self.orcamento_passo:
+            inicio = time.perf_counter()
+            self.prazo_passo = inicio + self.orcamento_passo
+
+        if self.reservas:
+            self.reservas.descartar_antes(self.passo_atual)
+        if self.encontros:
+            self.encontros.antes_do_passo(self.passo_atual)
+        if self.percepcao:
+            self.percepcao.atualizar()
+
+        if self.gravador:
+            self.gravador.inicio_passo(self)
+        if self.perfilador:
+            self.perfilador.inicio_passo(self)
+
+        if self.modo_sincrono:
+            self.step_duas_fases()
+        else:
+            for agente in self.agentes_ativos:
+                if self.encontros and agente in self.encontros.dormindo:  # Esperando carregadores: só acorda por evento
+                    continue
+                pos_anterior = agente.pos
+                if agente.pos == self.base_pos:  # Apenas agentes na base enviam informações para o BDI
+                    self.agente_bdi.receber_informacoes(agente)
+                agente.step()
+                if self.gravador and agente.pos != pos_anterior:
+                    self.gravador.movimento(self.passo_atual, agente)
+                if self.exploracao:
+                    self.exploracao.marcar_conhecida(agente.pos)
+
+        # BDI recebe o lote de mensagens do passo, processa e direciona agentes estratégicos
+        self.mensagens.entregar(self.agente_bdi)
+        self.agente_bdi.step()
+        if self.orcamento_passo:
+            self.registrar_tempo_real(time.perf_counter() - inicio)
+
+        self.passo_atual += 1
+        if self.perfilador:
+            self.perfilador.fim_passo(self)
+        if self.monitor_memoria:
+            self.monitor_memoria.apos_passo(self)
+        self.verificar_parada()
+
+    def step_duas_fases(self):
+        """
+        Fase 1: cada agente decide sobre o estado do início do passo (movimentos, coletas, entregas e os efeitos
+        na fronteira, nas mensagens, nas reservas e nos encontros ficam pendentes). Fase 2: aplica tudo em ordem
+        de handle; se dois agentes coletaram o mesmo objeto ou reservaram a mesma célula, vence o de menor handle
+        e os demais têm a decisão desfeita (ficam parados neste passo).
+        """
+        from duas_fases import DiarioEfeitos, GradeCongelada, copiar_estado, restaurar_estado, resolver_coletas
+
+        ativos = [agente for agente in self.agentes_ativos if agente not in self.encontros.dormindo] if self.encontros else self.agentes_ativos
+        for agente in ativos:
             if agente.pos == self.base_pos:  # Apenas agentes na base enviam informações para o BDI
                 self.agente_bdi.receber_informacoes(agente)
-            agente.step()
+        if self.percepcao:  # Leituras dos sensores com as posições do início do passo
+            self.percepcao.perceber_todos(self.agentes_ativos, self.passo_atual, self.raio_percepcao)
 
-        # BDI processa informações e direciona agentes estratégicos
-        self.agente_bdi.step()
+        grade = self.grid
+        congelada = self.grid = GradeCongelada(grade)
+        estados = {agente: copiar_estado(agente) for agente in ativos}  # Para desfazer a decisão de quem perder
+        diario = DiarioEfeitos(ativos)
+        compartilhados = [s for s in (self.mensagens, self.exploracao, self.reservas, self.encontros) if s is not None]
+        for estrutura in compartilhados:
+            estrutura.diario = diario
+        self.em_decisao = True
+        try:
+            if self.executor_decisoes:
+                list(self.executor_decisoes.map(lambda agente: agente.step(), ativos))
+            else:
+                for agente in ativos:
+                    agente.step()
+        finally:
+            self.em_decisao = False
+            self.grid = grade
+            for estrutura in compartilhados:
+                estrutura.diario = None
+
+        coletas, self.coletas_pendentes = self.coletas_pendentes, []
+        entregas, self.entregas_pendentes = self.entregas_pendentes, []
+        vencedoras, perdedores = resolver_coletas(coletas)
+        self.coletas_disputadas += len(perdedores)
+        if self.reservas:
+            for agente in perdedores:  # A rota de quem fica parado deixa de valer
+                self.reservas.cancelar(agente.unique_id)
+        perdedores |= diario.resolver_disputas(perdedores)
+        if perdedores:
+            for agente in perdedores:
+                restaurar_estado(agente, estados[agente])
+            vencedoras = [(objeto, agente) for objeto, agente in vencedoras if agente not in perdedores]
+            entregas = [(recurso, agente) for recurso, agente in entregas if agente not in perdedores]
+
+        for agente, origem, destino in congelada.movimentos():
+            if agente in perdedores:
+                continue
+            agente.pos = origem  # O grid real ainda tem o agente na célula de origem
+            grade.move_agent(agente, destino)
+            if self.gravador:
+                self.gravador.movimento(self.passo_atual, agente)
+
+        diario.aplicar(perdedores)
+        for objeto, agente in vencedoras:
+            self.recolher(objeto, agente)
+        for recurso, agente in sorted(entregas, key=lambda entrega: entrega[1].handle):
+            self.base.registrar_recurso(recurso, agente)
+
+        if self.exploracao:
+            for agente in self.agentes_ativos:
+                self.exploracao.marcar_conhecida(agente.pos)
+
+    def registrar_tempo_real(self, duracao):
+        """ Contabiliza o passo no modo de tempo real: estouro do orçamento e planejamentos adiados pelo BDI. """
+        estatisticas = self.tempo_real
+        estatisticas["passos"] += 1
+        estatisticas["tempo_total_s"] += duracao
+        estatisticas["maior_passo_s"] = max(estatisticas["maior_passo_s"], duracao)
+        if duracao > self.orcamento_passo:
+            estatisticas["estouros"] += 1
+        if self.agente_bdi.adiados:
+            estatisticas["planejamentos_adiados"] += self.agente_bdi.adiados
+            estatisticas["passos_com_adiamento"] += 1
+
+    def perceber(self, agente):
+        """ Leitura dos sensores do agente neste passo ({"Cristal", "Metal", "utilidade"}), calculada em lote para todos. """
+        return self.percepcao.perceber_todos(self.agentes_ativos, self.passo_atual, self.raio_percepcao)[agente.unique_id]
+
+    def ocupacao_raster(self, renderizador):
+        """ Matriz de códigos para o RenderizadorRaster: montada no primeiro quadro e mantida pelo grid daí em diante. """
+        if self.grid.ocupacao is None or self.grid.ocupacao.renderizador is not renderizador:
+            from raster import CamadaOcupacao
+            self.grid.ocupacao = CamadaOcupacao(renderizador, self)
+        return self.grid.ocupacao.codigos
+
+    def gravar_trilha(self, intervalo_quadros=100):
+        """ Passa a gravar a execução como trilha de eventos; salve com `self.gravador.salvar(caminho)`. """
+        from trilha import GravadorTrilha
+
+        self.gravador = GravadorTrilha(self, intervalo_quadros)
+        return self.gravador
+
+    def perfilar(self, inicio, fim, intervalo=0.005, caminho=None):
+        """ Amostra a pilha da simulação nos passos [inicio, fim) e grava pilhas colapsadas em `caminho`. """
+        from perfilador import PerfiladorAmostral
+
+        self.perfilador = PerfiladorAmostral(inicio, fim, intervalo, caminho)
+        return self.perfilador
+
+    def verificar_parada(self):
+        """ Encerra a simulação na primeira condição de parada satisfeita, registrando o motivo. """
+        for condicao in self.condicoes_parada:
+            motivo = condicao.verificar(self)
+            if motivo:
+                self.running = False
+                self.motivo_parada = motivo
+                if self.monitor_memoria:  # No servidor não há executar/resultado marcando o fim da execução
+                    self.monitor_memoria.parar()
+                return
+
+    def executar(self, passos=None):
+        """ Executa até uma condição de parada ou até `passos` passos e retorna o resultado da execução. """
+        proximo = time.perf_counter()
+        while self.running and (passos is None or self.passo_atual < passos):
+            self.step()
+            if self.orcamento_passo:  # Tempo real: um passo por orçamento, sem acumular atraso de passos que estouraram
+                proximo = max(proximo + self.orcamento_passo, time.perf_counter())
+                time.sleep(max(proximo - time.perf_counter(), 0))
+        if self.running and passos is not None:
+            self.motivo_parada = "passos_solicitados"
+        return self.resultado()
+
+    def resultado(self):
+        """ Resumo da execução. """
+        resultado = {
+            "passos": self.passo_atual,
+            "utilidade_total": self.base.utilidade_total(),
+            "recursos_entregues": self.base.quantidade_entregue(),
+            "encerrado": not self.running,
+            "motivo_parada": self.motivo_parada,
+        }
+        if self.monitor_memoria:
+            self.monitor_memoria.parar()  # O tracemalloc deixaria lentos os modelos seguintes do processo
+            resultado["memoria"] = self.monitor_memoria.relatorio()
+        if self.encontros:
+            resultado["encontros"] = self.encontros.relatorio()
+        if self.tempo_real:
+            resultado["tempo_real"] = dict(self.tempo_real, adiados_agora=self.agente_bdi.adiados,
+                                           passo_medio_s=self.tempo_real["tempo_total_s"] / max(self.tempo_real["passos"], 1))
+        if self.perfilador:
+            self.perfilador.parar()  # Faixa que passou do fim da execução
+            resultado["perfil"] = self.perfilador.relatorio()
+        return resultado
@@ -0,0 +1,158 @@
+import base64
+import math
+import struct
+import zlib
+
+import numpy as np
+
+# Cores por entidade, da camada mais baixa para a mais alta (as de cima cobrem as de baixo)
+PALETA = [
+    ("vazio", (255, 255, 255)),
+    ("desconhecido", (160, 160, 160)),
+    # PlanetModel (environment.py)
+    ("Obstacle", (128, 128, 128)),
+    ("Crystal", (0, 255, 255)),
+    ("MetalBlock", (192, 192, 192)),
+    ("AncientStructure", (255, 215, 0)),
+    ("Base", (0, 0, 255)),
+    # PlanetaModelo (objetos.py / agentes.py)
+    ("Recurso:Cristal", (173, 216, 230)),
+    ("Recurso:Metal", (128, 128, 128)),
+    ("Estrutura", (255, 165, 0)),
+    ("AgenteReativoSimples", (255, 0, 0)),
+    ("AgenteBaseadoEmEstado", (0, 128, 0)),
+    ("AgenteBaseadoEmObjetivos", (0, 0, 255)),
+    ("AgenteCooperativo", (128, 0, 128)),
+    ("BaseInicial", (0, 0, 0)),
+    ("AgenteBDI", (255, 255, 0)),
+]
+
+
+class RenderizadorRaster:
+    """ Monta o quadro do grid como imagem RGB (NumPy) a partir das posições ocupadas, com recorte e redução de escala. """
+
+    def __init__(self, paleta=PALETA):
+        self.codigos = {nome: codigo for codigo, (nome, _) in enumerate(paleta)}
+        self.cores = np.array([cor for _, cor in paleta], dtype=np.uint8)
+        self._codigo_por_tipo = {}  # (classe, tipo) -> código, para não recalcular nomes a cada entidade
+
+    def ocupacao(self, modelo):
+        """ Matriz (largura x altura) com o código da entidade de camada mais alta em cada célula. """
+        if hasattr(modelo, "ocupacao_raster"):  # Modelos que mantêm a matriz (PlanetaModelo, reprodução de trilha)
+            return modelo.ocupacao_raster(self)
+        return self.ocupacao_por_entidades(modelo)
+
+    def ocupacao_por_entidades(self, modelo):
+        """ `ocupacao` montada percorrendo todas as entidades vivas (modelos que não mantêm a matriz). """
+        xs, ys, codigos = [], [], []
+        for entidade in self._entidades(modelo):
+            pos = entidade.pos
+            if pos is None:
+                continue
+            xs.append(pos[0])
+            ys.append(pos[1])
+            codigos.append(self._codigo(entidade))
+
+        camada = np.zeros((modelo.grid.width, modelo.grid.height), dtype=np.uint8)
+        if codigos:
+            np.maximum.at(camada, (np.array(xs), np.array(ys)), np.array(codigos, dtype=np.uint8))
+        return camada
+
+    def quadro(self, modelo, x0=0, y0=0, largura=None, altura=None, saida=(500, 500)):
+        """
+        Retorna a imagem RGB (linhas x colunas x 3, origem do grid embaixo) da janela que começa em (x0, y0)
+        com `largura` x `altura` células, reduzida por blocos (camada mais alta) ou ampliada para caber em `saida`.
+        """
+        return self.colorir(self.ocupacao(modelo), x0, y0, largura, altura, saida)
+
+    def colorir(self, camada, x0=0, y0=0, largura=None, altura=None, saida=(500, 500)):
+        """ Recorta, ajusta a escala e converte uma matriz de códigos em imagem RGB. """
+        largura = largura or camada.shape[0] - x0
+        altura = altura or camada.shape[1] - y0
+        janela = camada[x0:x0 + largura, y0:y0 + altura]
+
+        fator = max(math.ceil(janela.shape[0] / saida[0]), math.ceil(janela.shape[1] / saida[1]), 1)
+        if fator > 1:
+            janela = self._reduzir(janela, fator)
+        else:
+            ampliacao = max(min(saida[0] // janela.shape[0], saida[1] // janela.shape[1]), 1)
+            janela = np.repeat(np.repeat(janela, ampliacao, axis=0), ampliacao, axis=1)
+
+        return self.cores[janela.T[::-1]]  # x -> colunas, y -> linhas (y = 0 na última linha)
+
+    def bytes_brutos(self, modelo, **janela):
+        """ Quadro como bytes RGB brutos, mais (largura, altura) em pixels. """
+        imagem = self.quadro(modelo, **janela)
+        return imagem.tobytes(), (imagem.shape[1], imagem.shape[0])
+
+    def png(self, modelo, **janela):
+        return codificar_png(self.quadro(modelo, **janela))
+
+    def codigo_por_nome(self, classe, tipo=None):
+        """ Código de camada a partir do nome da classe (e do tipo, para recursos). """
+        nome = f"Recurso:{tipo}" if classe == "Recurso" else classe
+        return self.codigos.get(nome, self.codigos["desconhecido"])
+
+    def _codigo(self, entidade):
+        chave = (type(entidade), getattr(entidade, "tipo", None))
+        codigo = self._codigo_por_tipo.get(chave)
+        if codigo is None:
+            codigo = self._codigo_por_tipo[chave] = self.codigo_por_nome(type(entidade).__name__, chave[1])
+        return codigo
+
+    @staticmethod
+    def _entidades(modelo):
+        registro = getattr(modelo, "registro", None)
+        if registro is not None:
+            return registro.por_id.values()  # Só entidades vivas
+        return modelo.agents
+
+    @staticmethod
+    def _reduzir(janela, fator):
+        """ Redução por blocos fator x fator, mantendo a camada mais alta de cada bloco. """
+        w, h = janela.shape
+        preenchida = janela
+        if w % fator or h % fator or not janela.flags.c_contiguous:
+            preenchida = np.zeros((math.ceil(w / fator) * fator, math.ceil(h / fator) * fator), dtype=janela.dtype)
+            preenchida[:w, :h] = janela
+        # Um eixo de cada vez: o máximo sobre linhas inteiras primeiro evita percorrer a memória em saltos
+        colunas = preenchida.reshape(preenchida.shape[0] // fator, fator, preenchida.shape[1]).max(axis=1)
+        return colunas.reshape(colunas.shape[0], colunas.shape[1] // fator, fator).max(axis=2)
+
+
+class CamadaOcupacao:
+    """
+    Matriz de códigos mantida junto do grid do modelo: montada uma vez a partir das entidades e, depois,
+    recalculada só nas células em que uma entidade entra ou sai, então cada quadro apenas colore a matriz.
+    """
+
+    def __init__(self, renderizador, modelo):
+        self.renderizador = renderizador
+        self.codigos = renderizador.ocupacao_por_entidades(modelo)
+
+    def atualizar(self, grade, pos):
+        """ Refaz a célula `pos` a partir das entidades que estão nela agora. """
+        self.codigos[pos] = max((self.renderizador._codigo(entidade) for entidade in grade.iter_cell_list_contents([pos])),
+                                default=0)
+
+
+def codificar_png(imagem):
+    """
+    Codifica uma imagem RGB uint8 (linhas x colunas x 3) como PNG, sem dependências além de zlib. A compressão
+    mais rápida basta: os quadros têm grandes áreas de uma cor só e são descartados no quadro seguinte.
+    """
+    altura, largura, _ = imagem.shape
+    linhas = np.zeros((altura, largura * 3 + 1), dtype=np.uint8)  # Cada linha começa com o filtro 0 (nenhum)
+    linhas[:, 1:] = imagem.reshape(altura, largura * 3)
+
+    def bloco(tipo, dados):
+        return struct.pack(">I", len(dados)) + tipo + dados + struct.pack(">I", zlib.crc32(tipo + dados) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n"
+            + bloco(b"IHDR", struct.pack(">IIBBBBB", largura, altura, 8, 2, 0, 0, 0))
+            + bloco(b"IDAT", zlib.compress(linhas.tobytes(), 1))
+            + bloco(b"IEND", b""))
+
+
+def png_base64(imagem_png):
+    return "data:image/png;base64," + base64.b64encode(imagem_png).decode("ascii")
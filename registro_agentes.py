@@ -0,0 +1,68 @@
+class RegistroAgentes:
+    """ Registro das entidades vivas do modelo, com handles inteiros e visões por tipo mantidas incrementalmente. """
+
+    def __init__(self):
+        self.entidades = []  # handle -> entidade (None depois de removida); handles nunca são reutilizados
+        self.por_id = {}  # unique_id -> entidade viva
+        self.handles = {}  # unique_id -> handle da entidade viva
+        # Visões por classe como dicionários handle -> entidade: ordem de iteração determinística
+        self.por_tipo = {}  # classe -> entidades vivas dessa classe
+        self.ociosos = {}  # classe -> agentes dessa classe que não carregam nada
+
+    def limpar(self):
+        """ Esquece todas as entidades; os próximos handles voltam a começar do zero. """
+        self.entidades.clear()
+        self.por_id.clear()
+        self.handles.clear()
+        self.por_tipo.clear()
+        self.ociosos.clear()
+
+    def __len__(self):
+        return len(self.por_id)
+
+    def __contains__(self, unique_id):
+        return unique_id in self.por_id
+
+    def adicionar(self, entidade, ocioso=False):
+        """ Registra a entidade e retorna seu handle inteiro. """
+        handle = len(self.entidades)
+        self.entidades.append(entidade)
+        entidade.handle = handle
+        self.por_id[entidade.unique_id] = entidade
+        self.handles[entidade.unique_id] = handle
+        self.por_tipo.setdefault(type(entidade), {})[handle] = entidade
+        if ocioso:
+            self.ociosos.setdefault(type(entidade), {})[handle] = entidade
+        return handle
+
+    def remover(self, entidade):
+        """ Retira a entidade de todas as visões; não faz nada se ela já foi removida. """
+        handle = self.handles.pop(entidade.unique_id, None)
+        if handle is None:
+            return
+        self.entidades[handle] = None
+        del self.por_id[entidade.unique_id]
+        del self.por_tipo[type(entidade)][handle]
+        self.ociosos.get(type(entidade), {}).pop(handle, None)
+
+    def obter(self, unique_id):
+        return self.por_id.get(unique_id)
+
+    def obter_por_handle(self, handle):
+        return self.entidades[handle] if 0 <= handle < len(self.entidades) else None
+
+    def do_tipo(self, classe):
+        """ Visão (mantida, não filtrada) das entidades vivas da classe. """
+        return self.por_tipo.get(classe, {}).values()
+
+    def ociosos_do_tipo(self, classe):
+        return self.ociosos.get(classe, {}).values()
+
+    def marcar_ocioso(self, agente, ocioso=True):
+        handle = self.handles.get(agente.unique_id)
+        if handle is None:
+            return
+        if ocioso:
+            self.ociosos.setdefault(type(agente), {})[handle] = agente
+        else:
+            self.ociosos.get(type(agente), {}).pop(handle, None)
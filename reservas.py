@@ -0,0 +1,189 @@
+import heapq
+from collections import deque
+
+
+class TabelaReservas:
+    """ Tabela de reservas espaço-tempo (célula x passo) para rotas cooperativas sem colisão entre agentes. """
+
+    def __init__(self, largura, altura, capacidades=None, capacidade_padrao=1, horizonte=32, max_expansoes=256):
+        self.largura = largura
+        self.altura = altura
+        self.capacidades = dict(capacidades or {})  # Células com capacidade própria (ex.: vagas de atracação da base)
+        self.capacidade_padrao = capacidade_padrao
+        # Rotas planejadas em trechos de até `horizonte` passos (o próximo trecho é planejado quando este acaba) e
+        # com no máximo `max_expansoes` estados, para que replanejar custe menos que o congestionamento evitado
+        self.horizonte = horizonte
+        self.max_expansoes = max_expansoes
+
+        self.ocupacao = {}  # (pos, t) -> número de agentes com reserva
+        self.arestas = {}  # (origem, destino, t) -> unique_id; evita que dois agentes troquem de célula
+        self.reservas_agente = {}  # unique_id -> lista de chaves (pos, t) e arestas reservadas
+        self.rotas = {}  # unique_id -> {"destino", "inicio", "posicoes"}
+        self.por_passo = {}  # t -> chaves de ocupação e arestas do passo t, para descartá-las quando o passo passar
+        self.passo_minimo = 0
+        self.replanejamentos = 0
+        self.disputas = 0  # Rotas planejadas na mesma fase de decisão que conflitaram com a de um handle menor
+        self.diario = None  # DiarioEfeitos durante a fase de decisão do passo em duas fases
+
+    def capacidade(self, pos):
+        return self.capacidades.get(pos, self.capacidade_padrao)
+
+    def livre(self, pos, t):
+        return self.ocupacao.get((pos, t), 0) < self.capacidade(pos)
+
+    def proximo_passo(self, agente, destino, t):
+        """
+        Próxima posição do agente na rota reservada até `destino`; replaneja só quando a rota deixa de valer.
+        Na fase de decisão do passo em duas fases a nova rota é planejada sobre a tabela do início do passo e
+        só é reservada na fase de aplicação, onde perde para a de um handle menor se as duas conflitarem.
+        """
+        uid = agente.unique_id
+        if agente.pos == destino:
+            self._efeito(agente, self.cancelar, uid)
+            return None
+
+        rota = self.rotas.get(uid)
+        if (rota is None or rota["destino"] != destino or rota["inicio"] != t + 1
+                or not rota["posicoes"] or rota["origem"] != agente.pos):
+            posicoes = self.planejar(agente.pos, destino, t, uid)
+            if not posicoes:
+                self._efeito(agente, self.cancelar, uid)
+                return None
+            if self.diario is not None:
+                self.diario.disputar(agente, self._reservar, uid, destino, t, agente.pos, posicoes)
+            else:
+                self._reservar(uid, destino, t, agente.pos, posicoes)
+            return posicoes[0]
+
+        pos = rota["posicoes"][0]
+        self._efeito(agente, self._avancar, uid)
+        return pos
+
+    def _efeito(self, agente, efeito, *args):
+        if self.diario is not None:
+            self.diario.adiar(agente, efeito, *args)
+        else:
+            efeito(*args)
+
+    def _avancar(self, unique_id):
+        rota = self.rotas[unique_id]
+        rota["origem"] = rota["posicoes"].popleft()
+        rota["inicio"] += 1
+
+    def cancelar(self, unique_id):
+        """ Libera todas as reservas futuras do agente. """
+        self.rotas.pop(unique_id, None)
+        for chave in self.reservas_agente.pop(unique_id, ()):
+            if len(chave) == 2:
+                if chave[1] >= self.passo_minimo:
+                    restante = self.ocupacao.get(chave, 0) - 1
+                    if restante > 0:
+                        self.ocupacao[chave] = restante
+                    else:
+                        self.ocupacao.pop(chave, None)
+            elif self.arestas.get(chave) == unique_id:
+                del self.arestas[chave]
+
+    def descartar_antes(self, t):
+        """ Esquece reservas de passos já simulados (chamado uma vez por passo); custa o número de reservas que vencem. """
+        if t <= self.passo_minimo:
+            return
+        for passo in range(self.passo_minimo, t):
+            for chave in self.por_passo.pop(passo, ()):
+                if len(chave) == 2:
+                    self.ocupacao.pop(chave, None)
+                else:
+                    self.arestas.pop(chave, None)
+        self.passo_minimo = t
+
+    def limpar(self):
+        self.ocupacao.clear()
+        self.arestas.clear()
+        self.reservas_agente.clear()
+        self.rotas.clear()
+        self.por_passo.clear()
+        self.passo_minimo = 0
+        self.replanejamentos = 0
+        self.disputas = 0
+
+    def planejar(self, origem, destino, t0, unique_id=None):
+        """
+        A* no espaço-tempo (8 vizinhos + esperar) respeitando capacidades e reservas existentes, exceto as do
+        próprio agente `unique_id` (que serão substituídas). Retorna as posições para t0+1, t0+2, ...; se o destino
+        não for alcançado dentro do horizonte, retorna o trecho que mais se aproxima dele.
+        """
+        def heuristica(p):
+            return max(abs(p[0] - destino[0]), abs(p[1] - destino[1]))
+
+        proprias = set(self.reservas_agente.get(unique_id, ()))
+
+        def livre(pos, t):
+            return self.ocupacao.get((pos, t), 0) - ((pos, t) in proprias) < self.capacidade(pos)
+
+        pais = {(origem, t0): None}
+        # (f, h, pos, t): o custo é t - t0; entre estados de mesmo f, o mais próximo do destino sai primeiro, senão
+        # a busca varre em largura o platô de rotas equivalentes que a distância de Chebyshev cria
+        aberta = [(heuristica(origem), heuristica(origem), origem, t0)]
+        melhor = (heuristica(origem), origem, t0)
+        expansoes = 0
+
+        while aberta and expansoes < self.max_expansoes:
+            _, _, pos, t = heapq.heappop(aberta)
+            if pos == destino or t - t0 >= self.horizonte:
+                # No horizonte, o trecho já é o início de uma rota ótima; o resto é planejado quando ele acabar
+                return self._reconstruir(pais, (pos, t))
+            expansoes += 1
+
+            x, y = pos
+            for vx in range(max(x - 1, 0), min(x + 2, self.largura)):
+                for vy in range(max(y - 1, 0), min(y + 2, self.altura)):
+                    viz = (vx, vy)
+                    estado = (viz, t + 1)
+                    if estado in pais or not livre(viz, t + 1):
+                        continue
+                    if viz != pos and self.arestas.get((viz, pos, t), unique_id) != unique_id:
+                        continue
+                    pais[estado] = (pos, t)
+                    h = heuristica(viz)
+                    if h < melhor[0]:
+                        melhor = (h, viz, t + 1)
+                    heapq.heappush(aberta, (t + 1 - t0 + h, h, viz, t + 1))
+
+        return self._reconstruir(pais, (melhor[1], melhor[2]))
+
+    def _reservar(self, unique_id, destino, t, origem, posicoes):
+        """ Troca as reservas do agente pela rota planejada e dá o seu primeiro passo; False se ela conflitar. """
+        self.cancelar(unique_id)
+        self.replanejamentos += 1
+        anterior = origem
+        for passo, pos in enumerate(posicoes, start=t + 1):
+            if not self.livre(pos, passo) or (pos != anterior and (pos, anterior, passo - 1) in self.arestas):
+                self.disputas += 1
+                return False
+            anterior = pos
+
+        chaves = []
+        anterior = origem
+        for passo, pos in enumerate(posicoes, start=t + 1):
+            chave = (pos, passo)
+            self.ocupacao[chave] = self.ocupacao.get(chave, 0) + 1
+            chaves.append(chave)
+            self.por_passo.setdefault(passo, []).append(chave)
+            if pos != anterior:
+                aresta = (anterior, pos, passo - 1)
+                self.arestas[aresta] = unique_id
+                chaves.append(aresta)
+                self.por_passo.setdefault(passo - 1, []).append(aresta)
+            anterior = pos
+        self.reservas_agente[unique_id] = chaves
+        self.rotas[unique_id] = {"destino": destino, "inicio": t + 1, "origem": origem, "posicoes": deque(posicoes)}
+        self._avancar(unique_id)
+
+    @staticmethod
+    def _reconstruir(pais, estado):
+        posicoes = []
+        while pais[estado] is not None:
+            posicoes.append(estado[0])
+            estado = pais[estado]
+        posicoes.reverse()
+        return posicoes
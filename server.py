@@ -4,6 +4,7 @@ from mesa.visualization import Slider, NumberInput, Choice  #Importação direta
 import random
 from model import PlanetModel
 from environment import Obstacle, Base, Crystal, MetalBlock, AncientStructure
+from visualizacao_raster import GradeRaster
 
 def agent_portrayal(agent):
     """
@@ -27,10 +28,11 @@ def agent_portrayal(agent):
         portrayal["Layer"] = 2
     return portrayal
 
-def create_server():
+def create_server(raster=False):
     """
     NOVO: Função criada para encapsular a construção do servidor.
     Isso permite recriar ou reconfigurar facilmente o servidor em tempo de execução.
+    Com `raster=True` o grid é desenhado no servidor e enviado como imagem (grids grandes).
     """
     #Sliders foram adicionados para permitir controle dos parâmetros pela interface web
     model_params = {
@@ -44,7 +46,7 @@ def create_server():
     #Largura e altura do grid agora são dinâmicas, baseadas nos sliders
     server = ModularServer(
         PlanetModel,
-        [CanvasGrid(agent_portrayal, model_params["width"].value, model_params["height"].value, 500, 500)],
+        [GradeRaster(500, 500) if raster else CanvasGrid(agent_portrayal, model_params["width"].value, model_params["height"].value, 500, 500)],
         "Planet Resource Collection",
         model_params
     )
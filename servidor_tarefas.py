@@ -0,0 +1,255 @@
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from simular import MODELOS
+
+# Estados de uma tarefa
+NA_FILA = "na_fila"
+EXECUTANDO = "executando"
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+CANCELADA = "cancelada"
+
+CHAVES_ACEITAS = {"modelo", "parametros", "passos", "seed", "prioridade"}
+
+
+def _executar_tarefa(especificacao):
+    """ Executa a especificação em um processo de trabalho (mesmo formato de simular.executar). """
+    from simular import executar
+
+    with contextlib.redirect_stdout(sys.stderr):  # Mensagens dos agentes não vão para a resposta
+        return executar(especificacao)
+
+
+def validar(especificacao, max_passos):
+    """ Confere uma especificação recebida; retorna a mensagem de erro ou None. """
+    if not isinstance(especificacao, dict):
+        return "a especificação deve ser um objeto JSON"
+    desconhecidas = set(especificacao) - CHAVES_ACEITAS
+    if desconhecidas:
+        return f"chaves não aceitas: {', '.join(sorted(desconhecidas))}"
+    if especificacao.get("modelo", "planeta") not in MODELOS:
+        return f"modelo desconhecido; use um de {', '.join(sorted(MODELOS))}"
+    if not isinstance(especificacao.get("parametros", {}), dict):
+        return "parametros deve ser um objeto"
+    passos = especificacao.get("passos", 100)
+    if not isinstance(passos, int) or not 0 < passos <= max_passos:
+        return f"passos deve ser um inteiro entre 1 e {max_passos}"
+    for chave in ("seed", "prioridade"):
+        if especificacao.get(chave) is not None and not isinstance(especificacao[chave], int):
+            return f"{chave} deve ser um inteiro"
+    return None
+
+
+class FilaTarefas:
+    """ Fila com prioridade de execuções, despachadas para um pool limitado de processos. """
+
+    def __init__(self, processos=None, max_concluidas=1000):
+        self.processos = processos or os.cpu_count() or 1
+        self.max_concluidas = max_concluidas
+        self.tarefas = OrderedDict()  # id -> tarefa (dicionário), na ordem de envio
+        self.fila = queue.PriorityQueue()  # (-prioridade, ordem de chegada, id)
+        self.enfileiradas = set()  # ids ainda na PriorityQueue (inclusive canceladas): não podem ser esquecidos
+        self.vagas = threading.Semaphore(self.processos)
+        self.trava = threading.Lock()
+        self.contador = itertools.count(1)
+        self.executor = ProcessPoolExecutor(max_workers=self.processos)
+        self.despachante = threading.Thread(target=self._despachar, daemon=True)
+        self.despachante.start()
+
+    def enviar(self, especificacao):
+        with self.trava:
+            numero = next(self.contador)
+            tarefa = {
+                "id": str(numero),
+                "estado": NA_FILA,
+                "prioridade": especificacao.pop("prioridade", 0) or 0,
+                "especificacao": especificacao,
+                "enviada_em": time.time(),
+                "iniciada_em": None,
+                "concluida_em": None,
+                "resultado": None,
+                "erro": None,
+            }
+            self.tarefas[tarefa["id"]] = tarefa
+            self.enfileiradas.add(tarefa["id"])
+        self.fila.put((-tarefa["prioridade"], numero, tarefa["id"]))
+        return tarefa
+
+    def obter(self, id_tarefa):
+        with self.trava:
+            tarefa = self.tarefas.get(id_tarefa)
+            return dict(tarefa) if tarefa is not None else None
+
+    def listar(self):
+        with self.trava:
+            return [resumo(tarefa) for tarefa in self.tarefas.values()]
+
+    def cancelar(self, id_tarefa):
+        """ Cancela uma tarefa ainda na fila; retorna False se ela já começou ou terminou. """
+        with self.trava:
+            tarefa = self.tarefas.get(id_tarefa)
+            if tarefa is None or tarefa["estado"] != NA_FILA:
+                return False
+            tarefa["estado"] = CANCELADA
+            tarefa["concluida_em"] = time.time()
+            return True
+
+    def na_fila(self):
+        with self.trava:
+            return sum(1 for tarefa in self.tarefas.values() if tarefa["estado"] == NA_FILA)
+
+    def encerrar(self):
+        self.fila.put((float("-inf"), 0, None))  # Sentinela à frente de tudo: o despachante sai sem enviar mais nada
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def _despachar(self):
+        """ Só tira uma tarefa da fila quando há um processo livre, para que a prioridade valha até o último momento. """
+        while True:
+            self.vagas.acquire()
+            _, _, id_tarefa = self.fila.get()
+            if id_tarefa is None:
+                return
+            tarefa = None
+            try:
+                with self.trava:
+                    self.enfileiradas.discard(id_tarefa)
+                    tarefa = self.tarefas.get(id_tarefa)
+                    if tarefa is None or tarefa["estado"] != NA_FILA:  # Cancelada enquanto esperava
+                        self.vagas.release()
+                        continue
+                    tarefa["estado"] = EXECUTANDO
+                    tarefa["iniciada_em"] = time.time()
+                futuro = self.executor.submit(_executar_tarefa, dict(tarefa["especificacao"]))
+                futuro.add_done_callback(lambda futuro, tarefa=tarefa: self._concluir(tarefa, futuro))
+            except Exception as erro:  # Uma tarefa com problema não pode parar o despachante
+                with self.trava:
+                    if tarefa is not None:
+                        tarefa["erro"] = f"{type(erro).__name__}: {erro}"
+                        tarefa["estado"] = FALHOU
+                        tarefa["concluida_em"] = time.time()
+                self.vagas.release()
+
+    def _concluir(self, tarefa, futuro):
+        with self.trava:
+            try:
+                tarefa["resultado"] = futuro.result()
+                tarefa["estado"] = CONCLUIDA
+            except Exception as erro:  # O erro da simulação fica registrado na tarefa
+                tarefa["erro"] = f"{type(erro).__name__}: {erro}"
+                tarefa["estado"] = FALHOU
+            tarefa["concluida_em"] = time.time()
+            self._esquecer_antigas()
+        self.vagas.release()
+
+    def _esquecer_antigas(self):
+        terminadas = [id_tarefa for id_tarefa, tarefa in self.tarefas.items()
+                      if tarefa["estado"] in (CONCLUIDA, FALHOU, CANCELADA) and id_tarefa not in self.enfileiradas]
+        for id_tarefa in terminadas[:max(len(terminadas) - self.max_concluidas, 0)]:
+            del self.tarefas[id_tarefa]
+
+
+def resumo(tarefa):
+    """ Tarefa sem o resultado completo, para listagens. """
+    return {chave: valor for chave, valor in tarefa.items() if chave != "resultado"}
+
+
+class ManipuladorTarefas(BaseHTTPRequestHandler):
+    """
+    POST /tarefas        envia uma especificação (JSON) e recebe o id
+    GET /tarefas         lista as tarefas e seus estados
+    GET /tarefas/<id>    estado e, quando concluída, o resultado
+    DELETE /tarefas/<id> cancela uma tarefa ainda na fila
+    """
+
+    fila = None  # FilaTarefas, definida em criar_servidor
+    max_passos = 1_000_000
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/tarefas":
+            return self._responder(404, {"erro": "caminho não encontrado"})
+        try:
+            tamanho = int(self.headers.get("Content-Length", 0))
+            especificacao = json.loads(self.rfile.read(tamanho) or b"{}")
+        except (ValueError, json.JSONDecodeError):
+            return self._responder(400, {"erro": "corpo JSON inválido"})
+        erro = validar(especificacao, self.max_passos)
+        if erro:
+            return self._responder(400, {"erro": erro})
+        tarefa = self.fila.enviar(especificacao)
+        self._responder(202, resumo(tarefa))
+
+    def do_GET(self):
+        partes = [parte for parte in self.path.split("/") if parte]
+        if partes == ["tarefas"]:
+            return self._responder(200, {"tarefas": self.fila.listar(), "na_fila": self.fila.na_fila(),
+                                         "processos": self.fila.processos})
+        if len(partes) == 2 and partes[0] == "tarefas":
+            tarefa = self.fila.obter(partes[1])
+            if tarefa is None:
+                return self._responder(404, {"erro": "tarefa não encontrada"})
+            return self._responder(200, tarefa)
+        self._responder(404, {"erro": "caminho não encontrado"})
+
+    def do_DELETE(self):
+        partes = [parte for parte in self.path.split("/") if parte]
+        if len(partes) != 2 or partes[0] != "tarefas":
+            return self._responder(404, {"erro": "caminho não encontrado"})
+        if self.fila.obter(partes[1]) is None:
+            return self._responder(404, {"erro": "tarefa não encontrada"})
+        if not self.fila.cancelar(partes[1]):
+            return self._responder(409, {"erro": "a tarefa já começou ou terminou"})
+        self._responder(200, resumo(self.fila.obter(partes[1])))
+
+    def _responder(self, codigo, corpo):
+        dados = json.dumps(corpo, default=str).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, formato, *args):
+        sys.stderr.write(f"[servidor_tarefas] {self.address_string()} {formato % args}\n")
+
+
+def criar_servidor(host="127.0.0.1", porta=8600, processos=None, max_passos=1_000_000):
+    """ Servidor HTTP com sua própria fila; chame `serve_forever()` e, ao final, `fila.encerrar()`. """
+    fila = FilaTarefas(processos)
+    manipulador = type("Manipulador", (ManipuladorTarefas,), {"fila": fila, "max_passos": max_passos})
+    servidor = ThreadingHTTPServer((host, porta), manipulador)
+    servidor.fila = fila
+    return servidor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor local de simulações: fila com prioridade e pool de processos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8600)
+    parser.add_argument("--processos", type=int, help="simulações simultâneas (padrão: número de CPUs)")
+    parser.add_argument("--max-passos", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    servidor = criar_servidor(args.host, args.porta, args.processos, args.max_passos)
+    print(f"Servidor de tarefas em http://{args.host}:{args.porta}/tarefas ({servidor.fila.processos} processos)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servidor.fila.encerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import contextlib
+import importlib
+import json
+import random
+import sys
+import time
+
+# Nome do modelo -> (módulo, classe, parâmetros padrão)
+MODELOS = {
+    "planeta": ("planet_model", "PlanetaModelo", {
+        "width": 20,
+        "height": 20,
+        "num_recursos": 30,
+        "num_estruturas": 5,
+        "num_agentes_reativos": 2,
+        "num_agentes_estado": 2,
+        "num_agentes_objetivos": 2,
+        "num_agentes_cooperativos": 2,
+    }),
+    "planet": ("model", "PlanetModel", {
+        "width": 20,
+        "height": 20,
+        "num_crystals": 30,
+        "num_metals": 20,
+        "num_structures": 10,
+    }),
+}
+
+# Pacotes pesados que uma execução sem interface não deveria precisar carregar
+PACOTES_PESADOS = ("visualizacao", "server", "mesa.visualization", "mesa_viz_tornado", "tornado", "solara", "matplotlib", "pandas")
+
+
+def importar_modelo(nome):
+    """ Importa apenas o módulo do modelo escolhido, medindo o tempo de importação. """
+    modulo, classe, _ = MODELOS[nome]
+    inicio = time.perf_counter()
+    classe_modelo = getattr(importlib.import_module(modulo), classe)
+    return classe_modelo, time.perf_counter() - inicio
+
+
+def resumir(modelo, passos_executados):
+    """ Resumo da execução; usa `resultado()` quando o modelo o oferece. """
+    if hasattr(modelo, "resultado"):
+        return modelo.resultado()
+
+    base = next(a for a in modelo.grid.get_cell_list_contents(modelo.base_pos) if getattr(a, "type", None) == "base")
+    return {
+        "passos": passos_executados,
+        "utilidade_total": base.total_utility,
+        "recursos_entregues": base.resources,
+    }
+
+
+def executar(especificacao):
+    """ Executa uma especificação {"modelo", "parametros", "passos", "seed", "trilha", "perfil"} e retorna o resumo. """
+    nome = especificacao.get("modelo", "planeta")
+    classe_modelo, tempo_importacao = importar_modelo(nome)
+    parametros = dict(MODELOS[nome][2])
+    parametros.update(especificacao.get("parametros", {}))
+    passos = especificacao.get("passos", 100)
+    seed = especificacao.get("seed")
+
+    inicio = time.perf_counter()
+    if nome == "planeta":
+        modelo = classe_modelo(seed=seed, **parametros)
+        if especificacao.get("trilha"):
+            modelo.gravar_trilha(especificacao.get("intervalo_quadros", 100))
+        if especificacao.get("perfil"):
+            inicio_perfil, fim_perfil = especificacao["perfil"]
+            modelo.perfilar(inicio_perfil, fim_perfil, especificacao.get("intervalo_perfil", 0.005),
+                            especificacao.get("perfil_saida", "perfil.folded"))
+        resumo = modelo.executar(passos)
+        if especificacao.get("trilha"):
+            modelo.gravador.salvar(especificacao["trilha"])
+    else:
+        if seed is not None:
+            random.seed(seed)
+        modelo = classe_modelo(**parametros)
+        for _ in range(passos):
+            modelo.step()
+        resumo = resumir(modelo, passos)
+
+    resumo.update({
+        "modelo": nome,
+        "parametros": parametros,
+        "seed": seed,
+        "tempo_execucao_s": time.perf_counter() - inicio,
+        "tempo_importacao_s": tempo_importacao,
+    })
+    return resumo
+
+
+def valor_parametro(texto):
+    """ Converte o valor de um --param (JSON quando possível, senão texto). """
+    try:
+        return json.loads(texto)
+    except json.JSONDecodeError:
+        return texto
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Executa uma simulação sem interface gráfica e imprime um resumo em JSON.")
+    parser.add_argument("--config", help="arquivo JSON com modelo, parametros, passos e seed")
+    parser.add_argument("--modelo", choices=sorted(MODELOS))
+    parser.add_argument("--passos", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--param", action="append", default=[], metavar="CHAVE=VALOR",
+                        help="parâmetro do modelo (pode ser repetido)")
+    parser.add_argument("--memoria", type=int, metavar="K",
+                        help="amostra a memória por subsistema a cada K passos (apenas planeta)")
+    parser.add_argument("--perfil", metavar="INICIO:FIM",
+                        help="amostra as pilhas nos passos [INICIO, FIM) (apenas planeta)")
+    parser.add_argument("--perfil-saida", default="perfil.folded",
+                        help="arquivo de pilhas colapsadas do --perfil (flamegraph.pl, speedscope)")
+    parser.add_argument("--trilha", help="grava a execução (apenas planeta) como trilha binária neste arquivo")
+    parser.add_argument("--tempo-importacao", action="store_true",
+                        help="inclui no resumo os pacotes pesados carregados na inicialização")
+    args = parser.parse_args(argv)
+
+    especificacao = {}
+    if args.config:
+        with open(args.config, encoding="utf-8") as arquivo:
+            especificacao = json.load(arquivo)
+    especificacao.setdefault("parametros", {})
+    for item in args.param:
+        chave, _, valor = item.partition("=")
+        especificacao["parametros"][chave] = valor_parametro(valor)
+    for chave in ("modelo", "passos", "seed", "trilha"):
+        if getattr(args, chave) is not None:
+            especificacao[chave] = getattr(args, chave)
+    if args.perfil:
+        inicio_perfil, _, fim_perfil = args.perfil.partition(":")
+        especificacao["perfil"] = [int(inicio_perfil), int(fim_perfil)]
+        especificacao["perfil_saida"] = args.perfil_saida
+    if args.memoria:
+        especificacao["parametros"]["memoria"] = {"intervalo": args.memoria}
+
+    with contextlib.redirect_stdout(sys.stderr):  # stdout fica só com o resumo, para ser lido por outros programas
+        resumo = executar(especificacao)
+    if args.tempo_importacao:
+        resumo["pacotes_pesados_carregados"] = [p for p in PACOTES_PESADOS if p in sys.modules]
+    json.dump(resumo, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import time
+
+
+class CondicaoParada:
+    """ Condição de parada verificada ao fim de cada passo; `verificar` retorna o motivo ou None. """
+
+    motivo = "condicao"
+
+    def reiniciar(self):
+        """ Limpa o estado interno antes de uma nova execução. """
+
+    def verificar(self, modelo):
+        return None
+
+
+class TodosRecursosEntregues(CondicaoParada):
+    """ Para quando todos os recursos e estruturas do mapa foram entregues na base. """
+
+    motivo = "todos_recursos_entregues"
+
+    def verificar(self, modelo):
+        if modelo.base.quantidade_entregue() >= modelo.num_recursos + modelo.num_estruturas:
+            return self.motivo
+        return None
+
+
+class PlatoUtilidade(CondicaoParada):
+    """ Para quando a utilidade total não cresce mais que `tolerancia` durante `janela` passos. """
+
+    motivo = "plato_utilidade"
+
+    def __init__(self, janela=200, tolerancia=0):
+        self.janela = janela
+        self.tolerancia = tolerancia
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.referencia = None
+        self.passo_referencia = 0
+
+    def verificar(self, modelo):
+        utilidade = modelo.base.utilidade_total()
+        if self.referencia is None or utilidade - self.referencia > self.tolerancia:
+            self.referencia = utilidade
+            self.passo_referencia = modelo.passo_atual
+            return None
+        if modelo.passo_atual - self.passo_referencia >= self.janela:
+            return self.motivo
+        return None
+
+
+class AgentesParados(CondicaoParada):
+    """ Para quando nenhum agente muda de posição ou de carga durante `janela` passos (ociosidade/impasse). """
+
+    motivo = "agentes_parados"
+
+    def __init__(self, janela=50):
+        self.janela = janela
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.ultimo_estado = None
+        self.passos_parados = 0
+
+    def verificar(self, modelo):
+        estado = tuple((agente.pos, agente.carregando_recurso) for agente in modelo.agentes_ativos)
+        if estado == self.ultimo_estado:
+            self.passos_parados += 1
+        else:
+            self.ultimo_estado = estado
+            self.passos_parados = 0
+        if self.passos_parados >= self.janela:
+            return self.motivo
+        return None
+
+
+class LimitePassos(CondicaoParada):
+    """ Para após `max_passos` passos. """
+
+    motivo = "limite_passos"
+
+    def __init__(self, max_passos):
+        self.max_passos = max_passos
+
+    def verificar(self, modelo):
+        if modelo.passo_atual >= self.max_passos:
+            return self.motivo
+        return None
+
+
+class LimiteTempo(CondicaoParada):
+    """ Para após `segundos` de tempo de parede desde o último `reiniciar`. """
+
+    motivo = "limite_tempo"
+
+    def __init__(self, segundos):
+        self.segundos = segundos
+        self.reiniciar()
+
+    def reiniciar(self):
+        self.inicio = time.perf_counter()
+
+    def verificar(self, modelo):
+        if time.perf_counter() - self.inicio >= self.segundos:
+            return self.motivo
+        return None
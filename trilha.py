@@ -0,0 +1,188 @@
+import bisect
+import json
+import struct
+
+import numpy as np
+
+MAGICO = b"TRILHA1\n"
+
+# Tipos de evento
+MOVER = 0  # entidade foi para (x, y)
+COLETAR = 1  # entidade saiu do grid; `dado` = handle do agente que coletou (-1 se nenhum)
+ENTREGAR = 2  # agente entregou na base; `dado` = utilidade
+ATRIBUIR = 3  # BDI atribuiu ao agente o destino (x, y)
+
+# passo, tipo, handle, x, y, dado: 17 bytes por evento
+EVENTO = struct.Struct("<IBIhhi")
+# handle, x, y de cada entidade presente no grid em um quadro-chave
+POSICAO = struct.Struct("<Ihh")
+TAMANHO = struct.Struct("<Q")
+
+
+class GravadorTrilha:
+    """ Grava uma execução de PlanetaModelo como trilha binária de eventos com quadros-chave periódicos. """
+
+    def __init__(self, modelo, intervalo_quadros=100):
+        self.intervalo_quadros = intervalo_quadros
+        self.eventos = bytearray()
+        self.quadros = bytearray()
+        self.indice_quadros = []  # [passo, deslocamento nos eventos, deslocamento nos quadros, quantidade, utilidade total]
+        self.quantidade_eventos = 0
+        self.cabecalho = {
+            "largura": modelo.grid.width,
+            "altura": modelo.grid.height,
+            "base_pos": list(modelo.base_pos),
+            # handle -> [unique_id, classe, tipo]; entidades já retiradas antes da gravação ficam [None, None, None]
+            "entidades": [[e.unique_id, type(e).__name__, getattr(e, "tipo", None)] if e is not None else [None] * 3
+                          for e in modelo.registro.entidades],
+        }
+        self.quadro_chave(modelo)  # A reprodução começa de um quadro-chave, mesmo que a gravação comece fora do intervalo
+
+    def inicio_passo(self, modelo):
+        """ Grava um quadro-chave com o estado antes do passo, a cada `intervalo_quadros` passos. """
+        if modelo.passo_atual % self.intervalo_quadros or self.indice_quadros[-1][0] == modelo.passo_atual:
+            return
+        self.quadro_chave(modelo)
+
+    def quadro_chave(self, modelo):
+        """ Grava as posições de todas as entidades no grid no passo atual do modelo. """
+        deslocamento, quantidade = len(self.quadros), 0
+        for entidade in modelo.registro.por_id.values():
+            if entidade.pos is not None:
+                self.quadros += POSICAO.pack(entidade.handle, entidade.pos[0], entidade.pos[1])
+                quantidade += 1
+        self.indice_quadros.append([modelo.passo_atual, len(self.eventos), deslocamento, quantidade,
+                                    modelo.base.utilidade_total()])
+
+    def movimento(self, passo, agente):
+        self._evento(passo, MOVER, agente.handle, agente.pos, 0)
+
+    def coleta(self, passo, objeto, agente=None):
+        self._evento(passo, COLETAR, objeto.handle, None, agente.handle if agente is not None else -1)
+
+    def entrega(self, passo, agente, utilidade):
+        self._evento(passo, ENTREGAR, agente.handle, agente.pos, int(utilidade))
+
+    def atribuicao(self, passo, agente, destino):
+        self._evento(passo, ATRIBUIR, agente.handle, destino, 0)
+
+    def salvar(self, caminho):
+        cabecalho = dict(self.cabecalho, quadros=self.indice_quadros, quantidade_eventos=self.quantidade_eventos)
+        dados_cabecalho = json.dumps(cabecalho).encode("utf-8")
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(MAGICO)
+            for bloco in (dados_cabecalho, self.eventos, self.quadros):
+                arquivo.write(TAMANHO.pack(len(bloco)))
+                arquivo.write(bloco)
+
+    def _evento(self, passo, tipo, handle, pos, dado):
+        x, y = pos if pos is not None else (-1, -1)
+        self.eventos += EVENTO.pack(passo, tipo, handle, x, y, dado)
+        self.quantidade_eventos += 1
+
+
+class ReprodutorTrilha:
+    """ Reproduz uma trilha gravada sem executar a lógica dos agentes: busca qualquer passo e avança em qualquer velocidade. """
+
+    def __init__(self, caminho):
+        with open(caminho, "rb") as arquivo:
+            if arquivo.read(len(MAGICO)) != MAGICO:
+                raise ValueError(f"{caminho} não é uma trilha gravada")
+            blocos = []
+            for _ in range(3):
+                (tamanho,) = TAMANHO.unpack(arquivo.read(TAMANHO.size))
+                blocos.append(arquivo.read(tamanho))
+
+        self.cabecalho = json.loads(blocos[0])
+        self.eventos = memoryview(blocos[1])
+        self.quadros = memoryview(blocos[2])
+        self.indice_quadros = self.cabecalho["quadros"]
+        self.passos_quadros = [q[0] for q in self.indice_quadros]
+        self.largura = self.cabecalho["largura"]
+        self.altura = self.cabecalho["altura"]
+        self.entidades = self.cabecalho["entidades"]
+
+        # Estado reproduzido: posição por handle (-1 = fora do grid) e passo correspondente
+        self.x = np.full(len(self.entidades), -1, dtype=np.int32)
+        self.y = np.full(len(self.entidades), -1, dtype=np.int32)
+        self.passo = None
+        self.cursor = 0
+        self.utilidade_total = 0
+        self.atribuicoes = {}  # handle do agente -> destino atual
+
+        self.ir_para(self.passos_quadros[0] if self.passos_quadros else 0)
+
+    @property
+    def ultimo_passo(self):
+        if not len(self.eventos):
+            return self.passos_quadros[-1] if self.passos_quadros else 0
+        return EVENTO.unpack_from(self.eventos, len(self.eventos) - EVENTO.size)[0] + 1
+
+    def ir_para(self, passo):
+        """ Posiciona a reprodução no estado após `passo` passos, partindo do quadro-chave anterior mais próximo. """
+        i = bisect.bisect_right(self.passos_quadros, passo) - 1
+        if i < 0:
+            raise ValueError(f"a trilha não tem quadro-chave anterior ao passo {passo}")
+        passo_quadro, deslocamento_eventos, deslocamento_quadro, quantidade, utilidade = self.indice_quadros[i]
+
+        # Se já estamos entre o quadro-chave e o destino, basta avançar
+        if self.passo is None or not passo_quadro <= self.passo <= passo:
+            self.x.fill(-1)
+            self.y.fill(-1)
+            fim = deslocamento_quadro + quantidade * POSICAO.size
+            for handle, x, y in POSICAO.iter_unpack(self.quadros[deslocamento_quadro:fim]):
+                self.x[handle] = x
+                self.y[handle] = y
+            self.passo = passo_quadro
+            self.cursor = deslocamento_eventos
+            self.utilidade_total = utilidade
+            self.atribuicoes = {}  # Só as atribuições feitas desde o quadro-chave
+
+        self.avancar(passo - self.passo)
+
+    def avancar(self, passos=1):
+        """ Aplica os eventos dos próximos `passos` passos. """
+        limite = self.passo + passos
+        eventos = self.eventos
+        while self.cursor < len(eventos):
+            passo, tipo, handle, x, y, dado = EVENTO.unpack_from(eventos, self.cursor)
+            if passo >= limite:
+                break
+            if tipo == MOVER:
+                self.x[handle] = x
+                self.y[handle] = y
+            elif tipo == COLETAR:
+                self.x[handle] = -1
+                self.y[handle] = -1
+            elif tipo == ENTREGAR:
+                self.utilidade_total += dado
+            elif tipo == ATRIBUIR:
+                self.atribuicoes[handle] = (x, y)
+            self.cursor += EVENTO.size
+        self.passo = limite
+
+    def eventos_entre(self, inicio, fim):
+        """ Eventos decodificados (passo, tipo, unique_id, pos, dado) com inicio <= passo < fim. """
+        i = bisect.bisect_right(self.passos_quadros, inicio) - 1
+        cursor = self.indice_quadros[i][1] if i >= 0 else 0
+        for passo, tipo, handle, x, y, dado in EVENTO.iter_unpack(self.eventos[cursor:]):
+            if passo >= fim:
+                return
+            if passo >= inicio:
+                yield passo, tipo, self.entidades[handle][0], (x, y) if x >= 0 else None, dado
+
+    def posicoes(self):
+        """ unique_id -> posição de cada entidade presente no grid no passo atual. """
+        presentes = np.nonzero(self.x >= 0)[0]
+        return {self.entidades[h][0]: (int(self.x[h]), int(self.y[h])) for h in presentes}
+
+    def ocupacao_raster(self, renderizador):
+        """ Matriz de códigos de camada para o RenderizadorRaster, montada de forma vetorizada. """
+        codigos = getattr(self, "_codigos", None)
+        if codigos is None:
+            codigos = self._codigos = np.array([renderizador.codigo_por_nome(classe, tipo)
+                                                for _, classe, tipo in self.entidades], dtype=np.uint8)
+        presentes = self.x >= 0
+        camada = np.zeros((self.largura, self.altura), dtype=np.uint8)
+        np.maximum.at(camada, (self.x[presentes], self.y[presentes]), codigos[presentes])
+        return camada
@@ -1,8 +1,10 @@
 from mesa.visualization.modules import CanvasGrid
 from mesa.visualization.ModularVisualization import ModularServer
+from mesa.visualization.modules import TextElement
 from planet_model import PlanetaModelo
 from objetos import Recurso, BaseInicial, Estrutura
 from agentes import AgenteReativoSimples, AgenteBaseadoEmEstado, AgenteBaseadoEmObjetivos, AgenteCooperativo, AgenteBDI 
+from visualizacao_raster import GradeRaster
 
 def agent_portrayal(agent):
     """ Define a aparência dos objetos e agentes no grid. """
@@ -40,19 +42,50 @@ def agent_portrayal(agent):
 # Criando o grid
 grid = CanvasGrid(agent_portrayal, 20, 20, 500, 500)
 
+parametros_modelo = {
+    "width": 20,
+    "height": 20,
+    "num_recursos": 30,
+    "num_estruturas": 5,
+    "num_agentes_reativos": 2,
+    "num_agentes_estado": 2,
+    "num_agentes_objetivos": 2,
+    "num_agentes_cooperativos": 2,  
+}
+
+class PainelMemoria(TextElement):
+    """ Mostra o último relatório de memória por subsistema do modelo. """
+
+    def render(self, model):
+        return model.monitor_memoria.texto() if model.monitor_memoria else ""
+
+class PainelTempoReal(TextElement):
+    """ Mostra estouros do orçamento de tempo e planejamentos adiados no modo de tempo real. """
+
+    def render(self, model):
+        if not model.tempo_real:
+            return ""
+        estatisticas = model.tempo_real
+        return (f"Orçamento {estatisticas['orcamento_s'] * 1000:.0f} ms | maior passo {estatisticas['maior_passo_s'] * 1000:.1f} ms"
+                f" | estouros {estatisticas['estouros']}/{estatisticas['passos']}"
+                f" | agentes aguardando planejamento {model.agente_bdi.adiados}")
+
+def criar_servidor(raster=False, parametros=None, intervalo_memoria=None, orcamento_passo=None):
+    """
+    Cria o servidor; com `raster=True` o grid é enviado como imagem, para mapas com milhares de objetos,
+    e com `intervalo_memoria` um painel mostra a memória por subsistema amostrada a cada tantos passos.
+    Com `orcamento_passo` (segundos) o modelo roda em tempo real: o planejamento do BDI cabe no orçamento
+    de cada passo, e um painel mostra os estouros; use a taxa de quadros da página igual a 1 / orcamento_passo.
+    """
+    elementos = [GradeRaster(500, 500) if raster else grid]
+    parametros = dict(parametros_modelo, **(parametros or {}))
+    if intervalo_memoria:
+        elementos.append(PainelMemoria())
+        parametros["memoria"] = {"intervalo": intervalo_memoria}
+    if orcamento_passo:
+        elementos.append(PainelTempoReal())
+        parametros["tempo_real"] = {"orcamento_passo": orcamento_passo}
+    return ModularServer(PlanetaModelo, elementos, "Simulação de Planeta", parametros)
+
 # Servidor da simulação
-server = ModularServer(
-    PlanetaModelo,
-    [grid],
-    "Simulação de Planeta",
-    {
-        "width": 20,
-        "height": 20,
-        "num_recursos": 30,
-        "num_estruturas": 5,
-        "num_agentes_reativos": 2,
-        "num_agentes_estado": 2,
-        "num_agentes_objetivos": 2,
-        "num_agentes_cooperativos": 2,  
-    }
-)
+server = criar_servidor()
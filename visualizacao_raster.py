@@ -0,0 +1,62 @@
+from mesa import Model
+from mesa.visualization import Slider, NumberInput
+from mesa.visualization.ModularVisualization import ModularServer
+from mesa.visualization.modules import TextElement
+from raster import RenderizadorRaster, png_base64
+from trilha import ReprodutorTrilha
+
+
+class GradeRaster(TextElement):
+    """
+    Substituto do CanvasGrid para grids grandes: o quadro é montado no servidor como PNG
+    e enviado como uma única imagem, em vez de um dicionário de desenho por agente.
+    """
+
+    def __init__(self, largura_px=500, altura_px=500, x0=0, y0=0, largura=None, altura=None):
+        super().__init__()
+        self.renderizador = RenderizadorRaster()
+        self.saida = (largura_px, altura_px)
+        self.janela = {"x0": x0, "y0": y0, "largura": largura, "altura": altura}
+
+    def ajustar_janela(self, x0=0, y0=0, largura=None, altura=None):
+        """
+        Define a região do grid (em células) exibida nos próximos quadros. Só pelo Python (ex.: ao montar
+        o servidor para uma área do mapa); a página não tem controle de zoom nem de deslocamento.
+        """
+        self.janela = {"x0": x0, "y0": y0, "largura": largura, "altura": altura}
+
+    def render(self, model):
+        imagem = self.renderizador.png(model, saida=self.saida, **self.janela)
+        return (f'<img src="{png_base64(imagem)}" width="{self.saida[0]}" height="{self.saida[1]}" '
+                f'style="image-rendering: pixelated">')
+
+
+class ModeloReproducao(Model):
+    """ Modelo de visualização que reproduz uma trilha gravada, avançando `velocidade` passos por quadro. """
+
+    def __init__(self, caminho, velocidade=1, passo_inicial=0):
+        super().__init__()
+        self.reprodutor = ReprodutorTrilha(caminho)
+        self.velocidade = velocidade
+        self.reprodutor.ir_para(max(passo_inicial, self.reprodutor.passos_quadros[0]))
+
+    def ocupacao_raster(self, renderizador):
+        return self.reprodutor.ocupacao_raster(renderizador)
+
+    def step(self):
+        self.reprodutor.avancar(self.velocidade)
+        self.running = self.reprodutor.passo < self.reprodutor.ultimo_passo
+
+
+def criar_servidor_reproducao(caminho, largura_px=500, altura_px=500):
+    """ Servidor que revê uma execução gravada, sem rodar a lógica dos agentes. """
+    return ModularServer(
+        ModeloReproducao,
+        [GradeRaster(largura_px, altura_px)],
+        "Reprodução de trilha",
+        {
+            "caminho": caminho,
+            "velocidade": Slider("Passos por quadro", 1, 1, 500, 1),
+            "passo_inicial": NumberInput("Passo inicial", 0),
+        }
+    )